@@ -5,6 +5,7 @@ Newsletter Agent - Main Entry Point
 Intelligent Newsletter Generation Agent
 """
 
+import importlib.util
 import sys
 import os
 from pathlib import Path
@@ -15,9 +16,10 @@ except ImportError:
     import logging
     logger = logging.getLogger(__name__)
 
-# Add project root directory to Python path
+# Add project root directory to Python path (only if the package is not importable already)
 project_root = Path(__file__).parent
-sys.path.insert(0, str(project_root))
+if importlib.util.find_spec("newsletter_agent") is None and str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
 
 # Import configuration
 try:
@@ -127,10 +129,22 @@ def check_environment():
     return True
 
 
+def install_event_loop():
+    """Use uvloop for asyncio event loops when it is installed (not available on Windows)"""
+    try:
+        import uvloop
+    except ImportError:
+        return False
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    logger.info("⚡ Using uvloop event loop")
+    return True
+
+
 def main():
     """Main function"""
     # Setup logging
     setup_logging()
+    install_event_loop()
     
     logger.info(f"🚀 Starting {settings.APP_NAME} v{settings.APP_VERSION}")
     
@@ -4,9 +4,11 @@ Newsletter Agent - 核心智能代理
 整合工具、提示模板和决策逻辑的主要AI代理
 """
 
-from typing import List, Dict, Any, Optional, Union
+from typing import AsyncIterator, Callable, List, Dict, Any, Optional
 from datetime import datetime
+import functools
 import json
+import time
 
 # 先导入日志系统
 try:
@@ -15,23 +17,55 @@ except ImportError:
     import logging
     logger = logging.getLogger(__name__)
 
-# 再导入LangChain组件
+# 再导入LangChain组件（只导入实际用到的部分，不加载 langchain.agents 执行器）
 try:
-    from langchain.agents import AgentExecutor, initialize_agent, AgentType
     from langchain_openai import ChatOpenAI
-    from langchain.schema import BaseMessage, HumanMessage, SystemMessage, AIMessage
+    from langchain.schema import HumanMessage
     from langchain.tools import BaseTool
     LANGCHAIN_AVAILABLE = True
     logger.info("LangChain导入成功")
 except ImportError as e:
     LANGCHAIN_AVAILABLE = False
-    AgentExecutor = object
     BaseTool = object
     ChatOpenAI = object
     logger.warning(f"LangChain导入失败: {e}")
     logger.info("代理将在受限模式下运行")
 
 
+@functools.lru_cache(maxsize=1)
+def _shared_http_client():
+    """进程内共享的HTTP客户端，所有代理实例的同步调用复用同一个连接池（未安装httpx时返回None）"""
+    try:
+        import httpx
+    except ImportError:
+        return None
+    try:
+        import h2  # noqa: F401  HTTP/2 需要 h2，可在一个连接上复用多个并发请求
+        http2 = True
+    except ImportError:
+        http2 = False
+    return httpx.Client(http2=http2, limits=httpx.Limits(max_keepalive_connections=8), timeout=60)
+
+
+# 提示模板中主题位置的占位标记
+_TOPIC_SLOT = "\x00topic\x00"
+
+
+def _parse_batch_reply(reply: str, tasks: Dict[str, str]) -> Optional[Dict[str, str]]:
+    """解析 chat_batch 的JSON回复，缺少任务或格式不对时返回None"""
+    text = reply.strip()
+    if text.startswith("```"):
+        # 去掉 ```json ... ``` 代码块包裹
+        text = text.split("\n", 1)[-1].rsplit("```", 1)[0]
+    try:
+        answers = json.loads(text)
+    except ValueError:
+        return None
+    if not isinstance(answers, dict) or not all(task_id in answers for task_id in tasks):
+        return None
+    return {task_id: str(answers[task_id]) for task_id in tasks}
+
+
 class NewsletterAgent:
     """新闻简报智能代理
     
@@ -81,13 +115,15 @@ class NewsletterAgent:
                 logger.warning("API密钥未配置，代理将以受限模式运行")
                 return None
             
+            http_client = _shared_http_client()
             llm = ChatOpenAI(
                 model="gpt-4.1",
                 openai_api_key=api_key,
                 openai_api_base=api_base,
                 temperature=0.7,
                 max_tokens=2000,
-                request_timeout=60
+                request_timeout=60,
+                **({"http_client": http_client} if http_client is not None else {})
             )
             
             logger.info("语言模型初始化成功")
@@ -140,50 +176,157 @@ class NewsletterAgent:
             代理响应结果
         """
         if not self.is_ready:
-            return {
-                "success": False,
-                "message": "代理未就绪，请检查配置",
-                "error": "Agent not ready"
-            }
+            return self._not_ready_response()
         
         try:
-            # 记录对话历史
-            self.conversation_history.append({
-                "role": "user",
-                "content": message,
-                "timestamp": datetime.now().isoformat(),
-                "context": context
-            })
-            
-            # 构建完整的提示
-            full_prompt = self._build_conversation_prompt(message, context)
+            full_prompt = self._begin_turn(message, context)
             
             # 由于AgentExecutor不可用，直接使用LLM
             response = self.llm.invoke([HumanMessage(content=full_prompt)])
-            response_content = response.content
+            return self._finish_turn(response.content)
             
-            # 记录代理响应
-            self.conversation_history.append({
-                "role": "assistant",
-                "content": response_content,
-                "timestamp": datetime.now().isoformat(),
-                "method": "direct_llm"
-            })
+        except Exception as e:
+            return self._failed_response(e)
+    
+    async def achat(self, message: str, context: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """与代理对话（异步版本）
+        
+        使用LLM的原生异步接口，多个对话可以用 asyncio.gather 并发执行，
+        网络等待时间互相重叠。参数和返回值与 chat 相同。
+        """
+        if not self.is_ready:
+            return self._not_ready_response()
+        
+        try:
+            full_prompt = self._begin_turn(message, context)
+            response = await self.llm.ainvoke([HumanMessage(content=full_prompt)])
+            return self._finish_turn(response.content)
             
-            return {
-                "success": True,
-                "message": response_content,
-                "session_id": self.session_id,
-                "method": "direct_llm"
-            }
+        except Exception as e:
+            return self._failed_response(e)
+    
+    async def achat_stream(self,
+                           message: str,
+                           context: Optional[Dict[str, Any]] = None,
+                           max_chunks: int = 50,
+                           max_delay: float = 0.2) -> AsyncIterator[str]:
+        """与代理对话（流式），边生成边返回文本
+        
+        模型的token级分块先合并再交给调用方：累计 max_chunks 块或距上次输出
+        超过 max_delay 秒时输出一次。调用方可以提前停止迭代。生成失败时
+        异常会抛给调用方；失败或提前停止的回复不记入对话历史。
+        
+        Args:
+            message: 用户消息
+            context: 额外上下文信息
+            max_chunks: 每次输出最多合并的分块数
+            max_delay: 两次输出之间的最长间隔（秒）
+        """
+        if not self.is_ready:
+            logger.warning("代理未就绪，请检查配置")
+            return
+        
+        parts = []
+        pending = []
+        last_flush = time.monotonic()
+        try:
+            full_prompt = self._begin_turn(message, context)
+            async for chunk in self.llm.astream([HumanMessage(content=full_prompt)]):
+                pending.append(chunk.content)
+                if len(pending) >= max_chunks or time.monotonic() - last_flush >= max_delay:
+                    text = "".join(pending)
+                    pending.clear()
+                    parts.append(text)
+                    last_flush = time.monotonic()
+                    yield text
             
+            if pending:
+                text = "".join(pending)
+                parts.append(text)
+                yield text
+        
         except Exception as e:
-            logger.error(f"代理对话失败: {e}")
-            return {
-                "success": False,
-                "message": "对话处理失败，请稍后重试",
-                "error": str(e)
-            }
+            logger.error(f"代理流式对话失败: {e}")
+            raise
+        
+        # 只有完整生成的回复才记入对话历史
+        self._finish_turn("".join(parts))
+    
+    def chat_batch(self, tasks: Dict[str, str]) -> Dict[str, Dict[str, Any]]:
+        """把多个相互独立的请求合并成一次LLM调用
+        
+        Args:
+            tasks: 任务ID到请求内容的映射
+            
+        Returns:
+            任务ID到响应结果的映射（结构同 chat）；合并回复无法解析时逐个调用 chat
+        """
+        if len(tasks) < 2:
+            return {task_id: self.chat(message) for task_id, message in tasks.items()}
+        
+        sections = "\n\n".join(f"### TASK {task_id}\n{message}" for task_id, message in tasks.items())
+        prompt = (
+            "请分别完成下面的每个任务。\n"
+            "只返回一个JSON对象，键为任务ID，值为该任务的完整回答（字符串）。\n\n"
+            f"{sections}"
+        )
+        
+        result = self.chat(prompt, {"task": "batch"})
+        if not result.get("success"):
+            return {task_id: result for task_id in tasks}
+        
+        answers = _parse_batch_reply(result["message"], tasks)
+        if answers is None:
+            logger.warning("批量回复解析失败，改为逐个请求")
+            return {task_id: self.chat(message) for task_id, message in tasks.items()}
+        
+        return {task_id: {**result, "message": answers[task_id]} for task_id in tasks}
+    
+    @staticmethod
+    def _not_ready_response() -> Dict[str, Any]:
+        return {
+            "success": False,
+            "message": "代理未就绪，请检查配置",
+            "error": "Agent not ready"
+        }
+    
+    @staticmethod
+    def _failed_response(error: Exception) -> Dict[str, Any]:
+        logger.error(f"代理对话失败: {error}")
+        return {
+            "success": False,
+            "message": "对话处理失败，请稍后重试",
+            "error": str(error)
+        }
+    
+    def _begin_turn(self, message: str, context: Optional[Dict[str, Any]]) -> str:
+        """记录用户消息并返回发送给LLM的完整提示"""
+        # 记录对话历史
+        self.conversation_history.append({
+            "role": "user",
+            "content": message,
+            "timestamp": datetime.now().isoformat(),
+            "context": context
+        })
+        
+        # 构建完整的提示
+        return self._build_conversation_prompt(message, context)
+    
+    def _finish_turn(self, response_content: str) -> Dict[str, Any]:
+        """记录代理响应并返回结果"""
+        self.conversation_history.append({
+            "role": "assistant",
+            "content": response_content,
+            "timestamp": datetime.now().isoformat(),
+            "method": "direct_llm"
+        })
+        
+        return {
+            "success": True,
+            "message": response_content,
+            "session_id": self.session_id,
+            "method": "direct_llm"
+        }
     
     def generate_newsletter(self, 
                           topic: str,
@@ -201,20 +344,41 @@ class NewsletterAgent:
         Returns:
             生成结果
         """
-        context = {
-            "task": "newsletter_generation",
-            "topic": topic,
-            "style": style,
-            "audience": audience,
-            "length": length
-        }
+        return self.generate_newsletter_partial(style, audience, length)(topic)
+    
+    def generate_newsletter_partial(self,
+                                    style: str = "professional",
+                                    audience: str = "general",
+                                    length: str = "medium") -> Callable[[str], Dict[str, Any]]:
+        """固定风格、受众和长度，返回只需传入主题的简报生成函数
         
+        提示模板只渲染一次并在主题处切开，之后每次调用只需拼接主题。
+        
+        Args:
+            style: 写作风格
+            audience: 目标受众
+            length: 内容长度
+            
+        Returns:
+            generate(topic) -> 生成结果
+        """
         if self.prompts:
-            prompt = self.prompts.get_newsletter_generation_prompt(topic, style, audience, length)
+            template = self.prompts.get_newsletter_generation_prompt(_TOPIC_SLOT, style, audience, length)
         else:
-            prompt = f"请生成关于'{topic}'的新闻简报，风格：{style}，受众：{audience}，长度：{length}"
+            template = f"请生成关于'{_TOPIC_SLOT}'的新闻简报，风格：{style}，受众：{audience}，长度：{length}"
+        prompt_parts = template.split(_TOPIC_SLOT)
+        
+        def generate(topic: str) -> Dict[str, Any]:
+            context = {
+                "task": "newsletter_generation",
+                "topic": topic,
+                "style": style,
+                "audience": audience,
+                "length": length
+            }
+            return self.chat(topic.join(prompt_parts), context)
         
-        return self.chat(prompt, context)
+        return generate
     
     def research_topic(self, topic: str, depth: str = "medium") -> Dict[str, Any]:
         """研究特定主题
@@ -281,16 +445,30 @@ class NewsletterAgent:
         
         return self.chat(prompt, context)
     
+    @functools.cached_property
+    def _static_status(self) -> Dict[str, Any]:
+        """状态中不随对话变化的部分（替换 llm 或 tools 后需调用 refresh_status）"""
+        return {
+            "llm_available": self.llm is not None,
+            "tools_count": len(self.tools),
+            "available_tools": tuple(tool.name for tool in self.tools) if self.tools else (),
+        }
+    
+    def refresh_status(self):
+        """使缓存的状态信息失效"""
+        self.__dict__.pop("_static_status", None)
+    
     def get_agent_status(self) -> Dict[str, Any]:
         """获取代理状态"""
+        static_status = self._static_status
         return {
             "agent_name": self.agent_name,
             "session_id": self.session_id,
             "is_ready": self.is_ready,
-            "llm_available": self.llm is not None,
-            "tools_count": len(self.tools),
+            "llm_available": static_status["llm_available"],
+            "tools_count": static_status["tools_count"],
             "conversation_turns": len(self.conversation_history),
-            "available_tools": [tool.name for tool in self.tools] if self.tools else [],
+            "available_tools": list(static_status["available_tools"]),
             "langchain_available": LANGCHAIN_AVAILABLE
         }
     
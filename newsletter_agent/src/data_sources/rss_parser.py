@@ -6,7 +6,7 @@ Newsletter Agent - RSS Feed解析器
 
 import time
 import requests
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 from datetime import datetime, timedelta
 from dataclasses import dataclass
 import logging
@@ -78,6 +78,10 @@ class RSSParser:
         
         self.timeout = 30  # 请求超时时间
         
+        # 已解析feed缓存: (URL, 最大文章数) -> (获取时间, 文章列表)
+        self.cache_ttl = 300  # 缓存有效期（秒）
+        self._feed_cache: Dict[Tuple[str, int], Tuple[float, List[RSSArticle]]] = {}
+        
         if not feedparser:
             logger.warning("feedparser未安装，RSS功能可能受限")
         if not BeautifulSoup:
@@ -204,6 +208,12 @@ class RSSParser:
             logger.error("feedparser未安装，无法解析RSS")
             return []
         
+        # 有效期内直接返回缓存结果，避免重复请求同一feed
+        cache_key = (feed_url, max_articles)
+        cached = self._feed_cache.get(cache_key)
+        if cached is not None and time.time() - cached[0] < self.cache_ttl:
+            return list(cached[1])
+        
         self._rate_limit()
         
         try:
@@ -239,7 +249,8 @@ class RSSParser:
                     continue
             
             logger.info(f"成功解析 {len(articles)} 篇文章 from {feed_info['title']}")
-            return articles
+            self._feed_cache[cache_key] = (time.time(), articles)
+            return list(articles)
             
         except requests.RequestException as e:
             logger.error(f"获取RSS feed失败 {feed_url}: {e}")
@@ -393,6 +404,10 @@ class RSSParser:
         
         return feeds_info
     
+    def clear_cache(self):
+        """清空feed缓存"""
+        self._feed_cache.clear()
+    
     def is_available(self) -> bool:
         """检查RSS解析器是否可用"""
         return feedparser is not None
@@ -4,7 +4,7 @@ Newsletter Agent - 新闻简报模板引擎
 提供专业的HTML和Markdown格式模板
 """
 
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Iterator, Optional, Tuple
 from datetime import datetime
 from dataclasses import dataclass
 import json
@@ -45,6 +45,8 @@ class NewsletterTemplateEngine:
             'html': self._load_html_templates(),
             'markdown': self._load_markdown_templates()
         }
+        # (格式, 风格) -> 以正文占位符切分后的 (模板头, 模板尾)
+        self._template_parts: Dict[Tuple[str, str], Tuple[str, str]] = {}
         logger.info("简报模板引擎初始化完成")
     
     def _load_html_templates(self) -> Dict[str, str]:
@@ -351,25 +353,58 @@ class NewsletterTemplateEngine:
     ) -> str:
         """生成完整的新闻简报"""
         try:
-            if output_format == "html":
-                return self._generate_html_newsletter(data, template_style)
-            elif output_format == "markdown":
-                return self._generate_markdown_newsletter(data, template_style)
-            else:
-                raise ValueError(f"不支持的输出格式: {output_format}")
-                
+            return "".join(self.iter_newsletter(data, template_style, output_format))
+            
         except Exception as e:
             logger.error(f"简报生成失败: {e}")
             return self._generate_error_newsletter(str(e))
     
-    def _generate_html_newsletter(self, data: NewsletterData, style: str) -> str:
-        """生成HTML格式简报"""
-        template = self.templates['html'].get(style, self.templates['html']['professional'])
+    def iter_newsletter(
+        self,
+        data: NewsletterData,
+        template_style: str = "professional",
+        output_format: str = "html"
+    ) -> Iterator[str]:
+        """逐段生成新闻简报，可直接写入文件或响应流而不拼出整篇字符串"""
+        if output_format == "html":
+            return self._iter_html_newsletter(data, template_style)
+        elif output_format == "markdown":
+            return self._iter_markdown_newsletter(data, template_style)
+        else:
+            raise ValueError(f"不支持的输出格式: {output_format}")
+    
+    def _template_halves(self, output_format: str, style: str, default_style: str, body_field: str) -> Tuple[str, str]:
+        """取出模板并以正文占位符切分（按格式和风格缓存）"""
+        key = (output_format, style)
+        parts = self._template_parts.get(key)
+        if parts is None:
+            templates = self.templates[output_format]
+            template = templates.get(style, templates[default_style])
+            head, _, tail = template.partition("{" + body_field + "}")
+            parts = self._template_parts[key] = (head, tail)
+        return parts
+    
+    @staticmethod
+    def _summary_fields(data: NewsletterData) -> Dict[str, Any]:
+        """模板头尾共用的统计字段"""
+        return {
+            'title': data.title,
+            'subtitle': data.subtitle,
+            'total_articles': sum(len(section.articles) for section in data.sections),
+            'total_sections': len(data.sections),
+            'generated_at': data.generated_at.strftime("%Y年%m月%d日 %H:%M"),
+        }
+    
+    def _iter_html_newsletter(self, data: NewsletterData, style: str) -> Iterator[str]:
+        """逐段生成HTML格式简报"""
+        head, tail = self._template_halves('html', style, 'professional', 'sections_html')
+        fields = self._summary_fields(data)
+        
+        yield head.format(**fields)
         
         # 生成章节HTML
-        sections_html = ""
         for section in sorted(data.sections, key=lambda x: x.priority):
-            sections_html += f'''
+            yield f'''
             <div class="section">
                 <h2 class="section-title">
                     <span class="category-tag">{section.category}</span>
@@ -381,7 +416,7 @@ class NewsletterTemplateEngine:
             '''
             
             for article in section.articles:
-                article_html = f'''
+                yield f'''
                 <div class="article">
                     <h3 class="article-title">
                         <a href="{article.get('url', '#')}" target="_blank">
@@ -398,72 +433,58 @@ class NewsletterTemplateEngine:
                     </div>
                 </div>
                 '''
-                sections_html += article_html
             
-            sections_html += "</div></div>"
+            yield "</div></div>"
         
-        # 填充模板变量
-        return template.format(
-            title=data.title,
-            subtitle=data.subtitle,
-            total_articles=sum(len(section.articles) for section in data.sections),
-            total_sections=len(data.sections),
-            generated_at=data.generated_at.strftime("%Y年%m月%d日 %H:%M"),
-            sections_html=sections_html
-        )
+        yield tail.format(**fields)
+    
+    @staticmethod
+    def _markdown_summary(article: Dict[str, Any]) -> str:
+        return article.get('summary', article.get('content', ''))[:150] + '...'
     
-    def _generate_markdown_newsletter(self, data: NewsletterData, style: str) -> str:
-        """生成Markdown格式简报"""
-        template = self.templates['markdown'].get(style, self.templates['markdown']['standard'])
+    def _iter_markdown_newsletter(self, data: NewsletterData, style: str) -> Iterator[str]:
+        """逐段生成Markdown格式简报"""
+        head, tail = self._template_halves('markdown', style, 'standard', 'sections_markdown')
+        sections = sorted(data.sections, key=lambda x: x.priority)
         
-        # 生成章节Markdown
-        sections_markdown = ""
-        table_of_contents = ""
+        # 目录和亮点只依赖标题和前几篇文章，先于正文算出
+        table_of_contents = "".join(
+            f"{i}. [{section.title}](#{section.title.replace(' ', '-').lower()})\n"
+            for i, section in enumerate(sections, 1)
+        )
         highlights = []
+        for section in sections:
+            for article in section.articles:
+                if len(highlights) >= 3:
+                    break
+                highlights.append(f"- **{article.get('title', '无标题')}** - {self._markdown_summary(article)[:100]}...")
         
-        for i, section in enumerate(sorted(data.sections, key=lambda x: x.priority), 1):
-            # 目录
-            table_of_contents += f"{i}. [{section.title}](#{section.title.replace(' ', '-').lower()})\n"
-            
+        fields = self._summary_fields(data)
+        fields['table_of_contents'] = table_of_contents
+        fields['highlights'] = "\n".join(highlights) if highlights else "本期内容精彩丰富，涵盖多个重要话题。"
+        
+        yield head.format(**fields)
+        
+        for i, section in enumerate(sections, 1):
             # 章节内容
-            sections_markdown += f"\n## {i}. {section.title}\n\n"
+            yield f"\n## {i}. {section.title}\n\n"
             if section.summary:
-                sections_markdown += f"*{section.summary}*\n\n"
+                yield f"*{section.summary}*\n\n"
             
             # 文章列表
             for j, article in enumerate(section.articles, 1):
                 title = article.get('title', '无标题')
                 url = article.get('url', '#')
-                summary = article.get('summary', article.get('content', ''))[:150] + '...'
                 source = article.get('source', '未知来源')
                 
-                sections_markdown += f"### {i}.{j} [{title}]({url})\n\n"
-                sections_markdown += f"{summary}\n\n"
-                sections_markdown += f"**来源:** {source}"
+                yield f"### {i}.{j} [{title}]({url})\n\n{self._markdown_summary(article)}\n\n**来源:** {source}"
                 
                 if article.get('published_at'):
-                    sections_markdown += f" | **时间:** {article.get('published_at')}"
-                
-                sections_markdown += "\n\n---\n\n"
+                    yield f" | **时间:** {article.get('published_at')}"
                 
-                # 收集亮点
-                if len(highlights) < 3:
-                    highlights.append(f"- **{title}** - {summary[:100]}...")
+                yield "\n\n---\n\n"
         
-        # 生成亮点
-        highlights_text = "\n".join(highlights) if highlights else "本期内容精彩丰富，涵盖多个重要话题。"
-        
-        # 填充模板变量
-        return template.format(
-            title=data.title,
-            subtitle=data.subtitle,
-            total_articles=sum(len(section.articles) for section in data.sections),
-            total_sections=len(data.sections),
-            generated_at=data.generated_at.strftime("%Y年%m月%d日 %H:%M"),
-            sections_markdown=sections_markdown,
-            table_of_contents=table_of_contents,
-            highlights=highlights_text
-        )
+        yield tail.format(**fields)
     
     def _generate_error_newsletter(self, error_msg: str) -> str:
         """生成错误简报"""
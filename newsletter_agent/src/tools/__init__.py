@@ -4,6 +4,8 @@ Newsletter Agent - 工具模块
 LangChain工具集合和工具管理功能
 """
 
+import functools
+
 # 导入工具类
 from .data_source_tools import (
     NewsSearchTool,
@@ -11,7 +13,8 @@ from .data_source_tools import (
     ContentAnalysisTool,
     TopicResearchTool,
     get_all_tools,
-    get_tool_by_name
+    get_tool_by_name,
+    _build_all_tools
 )
 
 from .ai_generation_tools import (
@@ -20,7 +23,8 @@ from .ai_generation_tools import (
     HeadlineGenerationTool,
     ContentEnhancementTool,
     get_ai_tools,
-    test_ai_connection
+    test_ai_connection,
+    _build_ai_tools
 )
 
 # 工具管理
@@ -45,10 +49,18 @@ def get_tools_by_category():
         "ai_generation": get_ai_tools()
     }
 
+@functools.lru_cache(maxsize=1)
+def _tool_names():
+    # 直接使用工具构建函数，构建失败时抛出异常，不缓存结果
+    return tuple(tool.name for tool in _build_all_tools() + _build_ai_tools())
+
 def get_tool_names():
     """获取所有工具名称"""
-    tools = get_all_available_tools()
-    return [tool.name for tool in tools]
+    try:
+        return list(_tool_names())
+    except Exception:
+        # 构建失败时退回逐类获取（记录错误，不缓存）
+        return [tool.name for tool in get_all_available_tools()]
 
 # 导出所有公共接口
 __all__ = [
@@ -4,7 +4,9 @@ Newsletter Agent - AI生成工具
 基于大语言模型的内容生成、摘要和增强工具
 """
 
-from typing import Type, Optional, List
+import functools
+import time
+from typing import Type, Optional, List, Tuple
 from langchain.tools import BaseTool
 from langchain.pydantic_v1 import BaseModel, Field
 from langchain.callbacks.manager import CallbackManagerForToolRun
@@ -32,6 +34,24 @@ except ImportError:
     settings = MockSettings()
 
 
+@functools.lru_cache(maxsize=8)
+def _chat_model(api_key: str, api_base: str, temperature: Optional[float], max_tokens: int):
+    """按配置缓存的语言模型客户端，各工具复用同一个实例（及其HTTP连接池）"""
+    kwargs = {"temperature": temperature} if temperature is not None else {}
+    return ChatOpenAI(
+        model="openai/gpt-4.1",
+        openai_api_key=api_key,
+        openai_api_base=api_base,
+        max_tokens=max_tokens,
+        **kwargs
+    )
+
+
+def _get_llm(temperature: Optional[float] = None, max_tokens: int = 1000):
+    """获取当前API配置下的语言模型"""
+    return _chat_model(settings.OPENAI_API_KEY, settings.OPENAI_API_BASE, temperature, max_tokens)
+
+
 class NewsletterGenerationInput(BaseModel):
     """新闻简报生成工具输入"""
     prompt: str = Field(description="简报生成提示，包含主题、风格、长度等要求")
@@ -57,13 +77,7 @@ class NewsletterGenerationTool(BaseTool):
             if not LANGCHAIN_AVAILABLE or not settings.OPENAI_API_KEY:
                 return self._generate_fallback_newsletter(prompt)
             
-            llm = ChatOpenAI(
-                model="openai/gpt-4.1",
-                openai_api_key=settings.OPENAI_API_KEY,
-                openai_api_base=settings.OPENAI_API_BASE,
-                temperature=0.7,
-                max_tokens=2000
-            )
+            llm = _get_llm(0.7, 2000)
             
             system_prompt = """你是一个专业的新闻简报编辑。请根据用户要求生成高质量的新闻简报。
 
@@ -144,13 +158,7 @@ class ContentSummaryTool(BaseTool):
             if not LANGCHAIN_AVAILABLE or not settings.OPENAI_API_KEY:
                 return self._generate_simple_summary(text)
             
-            llm = ChatOpenAI(
-                model="openai/gpt-4.1",
-                openai_api_key=settings.OPENAI_API_KEY,
-                openai_api_base=settings.OPENAI_API_BASE,
-                temperature=0.3,
-                max_tokens=500
-            )
+            llm = _get_llm(0.3, 500)
             
             prompt = f"""请为以下内容生成一个简洁准确的摘要：
 
@@ -214,13 +222,7 @@ class HeadlineGenerationTool(BaseTool):
             if not LANGCHAIN_AVAILABLE or not settings.OPENAI_API_KEY:
                 return self._generate_simple_headline(content)
             
-            llm = ChatOpenAI(
-                model="openai/gpt-4.1", 
-                openai_api_key=settings.OPENAI_API_KEY,
-                openai_api_base=settings.OPENAI_API_BASE,
-                temperature=0.8,
-                max_tokens=100
-            )
+            llm = _get_llm(0.8, 100)
             
             prompt = f"""基于以下内容，生成3个吸引人的标题：
 
@@ -278,13 +280,7 @@ class ContentEnhancementTool(BaseTool):
             if not LANGCHAIN_AVAILABLE or not settings.OPENAI_API_KEY:
                 return self._enhance_content_simple(content)
             
-            llm = ChatOpenAI(
-                model="openai/gpt-4.1",
-                openai_api_key=settings.OPENAI_API_KEY,
-                openai_api_base=settings.OPENAI_API_BASE,
-                temperature=0.5,
-                max_tokens=1000
-            )
+            llm = _get_llm(0.5, 1000)
             
             prompt = f"""请改进以下内容，使其更加清晰、准确和吸引人：
 
@@ -322,49 +318,67 @@ class ContentEnhancementTool(BaseTool):
         return enhanced
 
 
-def get_ai_tools() -> List[BaseTool]:
-    """获取所有AI工具"""
+@functools.lru_cache(maxsize=1)
+def _build_ai_tools() -> Tuple[BaseTool, ...]:
+    """构建工具集（进程内只构建一次；构建失败时抛出异常，不缓存结果）"""
     tools = []
     
+    # 新闻简报生成工具
+    newsletter_tool = NewsletterGenerationTool()
+    tools.append(newsletter_tool)
+    logger.info("AI工具 newsletter_generation 初始化成功")
+    
+    # 内容摘要工具
+    summary_tool = ContentSummaryTool()
+    tools.append(summary_tool)
+    logger.info("AI工具 content_summary 初始化成功")
+    
+    # 标题生成工具
+    headline_tool = HeadlineGenerationTool()
+    tools.append(headline_tool)
+    logger.info("AI工具 headline_generation 初始化成功")
+    
+    # 内容增强工具
+    enhancement_tool = ContentEnhancementTool()
+    tools.append(enhancement_tool)
+    logger.info("AI工具 content_enhancement 初始化成功")
+    
+    return tuple(tools)
+
+
+def get_ai_tools() -> List[BaseTool]:
+    """获取所有AI工具"""
     try:
-        # 新闻简报生成工具
-        newsletter_tool = NewsletterGenerationTool()
-        tools.append(newsletter_tool)
-        logger.info("AI工具 newsletter_generation 初始化成功")
-        
-        # 内容摘要工具
-        summary_tool = ContentSummaryTool()
-        tools.append(summary_tool)
-        logger.info("AI工具 content_summary 初始化成功")
-        
-        # 标题生成工具
-        headline_tool = HeadlineGenerationTool()
-        tools.append(headline_tool)
-        logger.info("AI工具 headline_generation 初始化成功")
-        
-        # 内容增强工具
-        enhancement_tool = ContentEnhancementTool()
-        tools.append(enhancement_tool)
-        logger.info("AI工具 content_enhancement 初始化成功")
-        
+        return list(_build_ai_tools())
     except Exception as e:
         logger.error(f"AI工具初始化失败: {e}")
+        return []
+
+
+# AI连接探测结果的缓存时间（秒）
+AI_PROBE_TTL = 60.0
+_last_ai_probe: Optional[Tuple[float, bool]] = None
+
+
+def test_ai_connection(force: bool = False) -> bool:
+    """测试AI连接（结果缓存 AI_PROBE_TTL 秒，force=True 时重新探测）"""
+    global _last_ai_probe
+    now = time.monotonic()
+    if not force and _last_ai_probe is not None and now - _last_ai_probe[0] < AI_PROBE_TTL:
+        return _last_ai_probe[1]
     
-    return tools
+    result = _probe_ai_connection()
+    _last_ai_probe = (now, result)
+    return result
 
 
-def test_ai_connection() -> bool:
-    """测试AI连接"""
+def _probe_ai_connection() -> bool:
+    """发送一次真实请求测试AI连接"""
     try:
         if not LANGCHAIN_AVAILABLE or not settings.OPENAI_API_KEY:
             return False
         
-        llm = ChatOpenAI(
-            model="openai/gpt-4.1",
-            openai_api_key=settings.OPENAI_API_KEY,
-            openai_api_base=settings.OPENAI_API_BASE,
-            max_tokens=10
-        )
+        llm = _get_llm(max_tokens=10)
         
         response = llm.invoke([HumanMessage(content="Hello")])
         return True
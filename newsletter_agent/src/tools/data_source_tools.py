@@ -4,7 +4,8 @@ Newsletter Agent - 数据源工具
 集成各种数据源的搜索和信息获取工具
 """
 
-from typing import Type, Optional, List
+import functools
+from typing import Type, Optional, List, Tuple, Dict
 from langchain.tools import BaseTool
 from langchain.pydantic_v1 import BaseModel, Field
 from langchain.callbacks.manager import CallbackManagerForToolRun
@@ -362,41 +363,53 @@ class TopicResearchTool(BaseTool):
 *本报告为示例内容，实际研究需要更多数据支持*"""
 
 
-def get_all_tools() -> List[BaseTool]:
-    """获取所有数据源工具"""
+@functools.lru_cache(maxsize=1)
+def _build_all_tools() -> Tuple[BaseTool, ...]:
+    """构建工具集（进程内只构建一次；构建失败时抛出异常，不缓存结果）"""
     tools = []
     
+    # 新闻搜索工具
+    news_tool = NewsSearchTool()
+    tools.append(news_tool)
+    logger.info("工具 news_search 初始化成功")
+    
+    # 热门话题工具
+    trending_tool = TrendingTopicsTool()
+    tools.append(trending_tool)
+    logger.info("工具 trending_topics 初始化成功")
+    
+    # 内容分析工具
+    analysis_tool = ContentAnalysisTool()
+    tools.append(analysis_tool)
+    logger.info("工具 content_analysis 初始化成功")
+    
+    # 主题研究工具
+    research_tool = TopicResearchTool()
+    tools.append(research_tool)
+    logger.info("工具 topic_research 初始化成功")
+    
+    return tuple(tools)
+
+
+def get_all_tools() -> List[BaseTool]:
+    """获取所有数据源工具"""
     try:
-        # 新闻搜索工具
-        news_tool = NewsSearchTool()
-        tools.append(news_tool)
-        logger.info("工具 news_search 初始化成功")
-        
-        # 热门话题工具
-        trending_tool = TrendingTopicsTool()
-        tools.append(trending_tool)
-        logger.info("工具 trending_topics 初始化成功")
-        
-        # 内容分析工具
-        analysis_tool = ContentAnalysisTool()
-        tools.append(analysis_tool)
-        logger.info("工具 content_analysis 初始化成功")
-        
-        # 主题研究工具
-        research_tool = TopicResearchTool()
-        tools.append(research_tool)
-        logger.info("工具 topic_research 初始化成功")
-        
+        return list(_build_all_tools())
     except Exception as e:
         logger.error(f"工具初始化失败: {e}")
-    
-    return tools
+        return []
+
+
+@functools.lru_cache(maxsize=1)
+def _tools_by_name() -> Dict[str, BaseTool]:
+    """工具名称到工具实例的索引（与 _build_all_tools 共用同一批实例）"""
+    return {tool.name: tool for tool in _build_all_tools()}
 
 
 def get_tool_by_name(name: str) -> Optional[BaseTool]:
     """根据名称获取工具"""
-    all_tools = get_all_tools()
-    for tool in all_tools:
-        if tool.name == name:
-            return tool
-    return None 
\ No newline at end of file
+    try:
+        return _tools_by_name().get(name)
+    except Exception as e:
+        logger.error(f"工具初始化失败: {e}")
+        return None
\ No newline at end of file
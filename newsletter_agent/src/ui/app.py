@@ -4,6 +4,8 @@ Newsletter Agent - User Interface
 Gradio-based web interface
 """
 
+import functools
+import html
 import gradio as gr
 from typing import List, Tuple, Dict, Any
 from datetime import datetime
@@ -14,8 +16,9 @@ except ImportError:
     import logging
     logger = logging.getLogger(__name__)
 
+from newsletter_agent.src.user.preferences import STYLES, LENGTHS
+
 try:
-    from newsletter_agent.src.agents import get_global_agent, get_agent_status
     from newsletter_agent.src.templates.newsletter_templates import NewsletterTemplateEngine
     from newsletter_agent.src.user.preferences import UserPreferencesManager
     from newsletter_agent.src.user.subscription import SubscriptionManager
@@ -23,9 +26,104 @@ try:
     from newsletter_agent.config.settings import settings
 except ImportError as e:
     logger.error(f"Module import failed: {e}")
-    # Create mock objects
-    get_global_agent = None
-    get_agent_status = None
+
+
+# Constant scaffolding of the HTML preview
+_HTML_HEAD = '<div class="newsletter"><h1>📰 Smart Newsletter</h1><div class="metadata">'
+_HTML_BODY_OPEN = '</div><div class="content">'
+_HTML_TAIL = '</div></div>'
+
+
+def _render_newsletter_html(topic: str, style: str, generated_at: str, content: str) -> str:
+    """Render newsletter content into the HTML preview wrapper"""
+    return "".join((
+        _HTML_HEAD,
+        f"<p><strong>Topic:</strong> {html.escape(topic)}</p>",
+        f"<p><strong>Style:</strong> {html.escape(style)}</p>",
+        f"<p><strong>Generated at:</strong> {generated_at}</p>",
+        _HTML_BODY_OPEN,
+        html.escape(content).translate(_NL_TABLE),
+        _HTML_TAIL,
+    ))
+
+
+# Stylesheet for the newsletter preview
+_APP_CSS = """
+.newsletter {
+    max-width: 800px;
+    margin: 0 auto;
+    padding: 20px;
+    background: white;
+    border-radius: 10px;
+    box-shadow: 0 2px 10px rgba(0,0,0,0.1);
+}
+.metadata {
+    background: #f8f9fa;
+    padding: 15px;
+    border-radius: 8px;
+    margin: 15px 0;
+    border-left: 4px solid #007bff;
+}
+.content {
+    line-height: 1.6;
+    color: #333;
+}
+"""
+
+# Usage guide tab content
+_USAGE_GUIDE_MD = """
+## 🎯 Usage Steps
+
+1. **Select Topic** - Enter your topic of interest in the "Newsletter topic" field
+2. **Set Preferences** - Choose writing style, content length and target audience
+3. **Select Categories** - Check the content categories you're interested in
+4. **Generate Newsletter** - Click the "Generate Newsletter" button to create
+5. **View Results** - Check the generated newsletter in HTML Preview or Markdown tabs
+
+## 🔧 Features
+
+- ✅ **Smart Generation** - Automatically generates personalized newsletters using AI
+- ✅ **Multiple Styles** - Supports professional, casual, academic and creative writing styles  
+- ✅ **Content Customization** - Adjustable content length and target audience
+- ✅ **Multiple Output Formats** - Supports both HTML and Markdown output
+- ✅ **Real-time Generation** - Fast response with immediate results
+
+## 💡 Tips
+
+- **Topic Suggestions**: Use specific topic descriptions like "AI applications in healthcare"
+- **Style Selection**: Choose appropriate style based on your readers
+- **Category Filtering**: Selecting relevant categories helps generate more precise content
+
+## 🚀 Getting Started
+
+Switch to the "Generate Newsletter" tab now to create your first smart newsletter!
+"""
+
+
+@functools.lru_cache(maxsize=1)
+def _agent_mod():
+    """Import the agent package on first use (it pulls in the LangChain stack)"""
+    try:
+        from newsletter_agent.src import agents
+    except ImportError as e:
+        logger.error(f"Agent module import failed: {e}")
+        return None
+    return agents
+
+
+# Dropdown / checkbox choices
+AUDIENCES = ("general", "tech", "business", "academic")
+CATEGORIES = ("Technology", "Business", "Health", "Entertainment", "Sports", "Politics", "Education")
+
+# Maximum number of queued generate requests merged into one handler call
+MAX_BATCH_SIZE = 4
+
+# Newline -> <br> mapping for the HTML preview
+_NL_TABLE = str.maketrans({"\n": "<br>"})
+
+# System status section headers
+_DATA_SOURCES_HEADER = "\n📡 Data sources status:"
+_SYSTEM_CONFIG_HEADER = "\n⚙️ System configuration:"
 
 
 def create_app():
@@ -50,8 +148,9 @@ def create_app():
             logger.info(f"Starting newsletter generation: {topic}")
             
             # Get agent
-            if get_global_agent:
-                agent = get_global_agent()
+            agents = _agent_mod()
+            if agents:
+                agent = agents.get_global_agent()
                 
                 # Perform topic research
                 research_prompt = f"Research topic '{topic}', collect relevant information and latest updates"
@@ -82,29 +181,17 @@ Please generate a structured newsletter containing:
                 
                 if newsletter_result.get('success'):
                     newsletter_content = newsletter_result['message']
+                    generated_at = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
                     
                     # Format as HTML
-                    html_newsletter_content = newsletter_content.replace('\n', '<br>')
-                    html_content = f"""
-                    <div class="newsletter">
-                        <h1>📰 Smart Newsletter</h1>
-                        <div class="metadata">
-                            <p><strong>Topic:</strong> {topic}</p>
-                            <p><strong>Style:</strong> {style}</p>
-                            <p><strong>Generated at:</strong> {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}</p>
-                        </div>
-                        <div class="content">
-                            {html_newsletter_content}
-                        </div>
-                    </div>
-                    """
+                    html_content = _render_newsletter_html(topic, style, generated_at, newsletter_content)
                     
                     # Generate Markdown format
                     markdown_content = f"""# 📰 Smart Newsletter
 
 **Topic:** {topic}  
 **Style:** {style}  
-**Generated at:** {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
+**Generated at:** {generated_at}
 
 ---
 
@@ -157,20 +244,7 @@ This newsletter focuses on the latest developments and important trends in {topi
 *Generated by Newsletter Agent | {current_time}*
 """
                 
-                html_example_content = example_content.replace('\n', '<br>')
-                html_content = f"""
-                <div class="newsletter">
-                    <h1>📰 Smart Newsletter</h1>
-                    <div class="metadata">
-                        <p><strong>Topic:</strong> {topic}</p>
-                        <p><strong>Style:</strong> {style}</p>
-                        <p><strong>Generated at:</strong> {current_time}</p>
-                    </div>
-                    <div class="content">
-                        {html_example_content}
-                    </div>
-                </div>
-                """
+                html_content = _render_newsletter_html(topic, style, current_time, example_content)
                 
                 success_msg = f"✅ Newsletter generated successfully! Topic: {topic} (Example mode)"
                 return success_msg, html_content, example_content
@@ -180,18 +254,44 @@ This newsletter focuses on the latest developments and important trends in {topi
             error_msg = f"❌ Newsletter generation failed: {str(e)}"
             return error_msg, "", ""
     
+    def generate_newsletter_batch(
+        topics: List[str],
+        styles: List[str],
+        lengths: List[str],
+        audiences: List[str],
+        categories_list: List[List[str]]
+    ) -> Tuple[List[str], List[str], List[str]]:
+        """Generate newsletters for a batch of queued requests
+        
+        Requests run one at a time: they share the global agent, whose
+        conversation history is not safe to update concurrently.
+        """
+        results = list(map(
+            generate_complete_newsletter,
+            topics, styles, lengths, audiences, categories_list
+        ))
+        
+        if not results:
+            return [], [], []
+        
+        status_msgs, html_contents, markdown_contents = zip(*results)
+        return list(status_msgs), list(html_contents), list(markdown_contents)
+    
     def get_system_status() -> str:
         """Get system status"""
         try:
             status_info = []
             
             # Agent status
-            if get_agent_status:
-                agent_status = get_agent_status()
+            agents = _agent_mod()
+            if agents:
+                agent_status = agents.get_agent_status()
                 if agent_status.get('is_ready'):
-                    status_info.append("✅ AI Agent: Ready")
-                    status_info.append(f"   - Available tools: {agent_status.get('tools_count', 0)}")
-                    status_info.append(f"   - Language model: {'Available' if agent_status.get('llm_available') else 'Unavailable'}")
+                    status_info.extend((
+                        "✅ AI Agent: Ready",
+                        f"   - Available tools: {agent_status.get('tools_count', 0)}",
+                        f"   - Language model: {'Available' if agent_status.get('llm_available') else 'Unavailable'}",
+                    ))
                 else:
                     status_info.append("❌ AI Agent: Not ready")
             else:
@@ -201,20 +301,22 @@ This newsletter focuses on the latest developments and important trends in {topi
             try:
                 from newsletter_agent.src.data_sources.aggregator import data_aggregator
                 data_status = data_aggregator.get_data_sources_status()
-                status_info.append("\n📡 Data sources status:")
-                for source, info in data_status.items():
-                    if info.get('available'):
-                        status_info.append(f"   ✅ {source.upper()}: Available")
-                    else:
-                        status_info.append(f"   ❌ {source.upper()}: Unavailable")
+                status_info.append(_DATA_SOURCES_HEADER)
+                status_info.extend(
+                    f"   ✅ {source.upper()}: Available" if info.get('available')
+                    else f"   ❌ {source.upper()}: Unavailable"
+                    for source, info in data_status.items()
+                )
             except Exception as e:
                 status_info.append(f"❌ Data sources: Check failed ({e})")
             
             # System configuration
-            status_info.append("\n⚙️ System configuration:")
-            status_info.append(f"   - App version: {settings.APP_VERSION}")
-            status_info.append(f"   - Debug mode: {'Enabled' if settings.DEBUG else 'Disabled'}")
-            status_info.append(f"   - Content language: {settings.CONTENT_LANGUAGE}")
+            status_info.extend((
+                _SYSTEM_CONFIG_HEADER,
+                f"   - App version: {settings.APP_VERSION}",
+                f"   - Debug mode: {'Enabled' if settings.DEBUG else 'Disabled'}",
+                f"   - Content language: {settings.CONTENT_LANGUAGE}",
+            ))
             
             return "\n".join(status_info)
             
@@ -225,27 +327,7 @@ This newsletter focuses on the latest developments and important trends in {topi
     with gr.Blocks(
         title="Newsletter Agent - Smart Newsletter Generator",
         theme=gr.themes.Soft(),
-        css="""
-        .newsletter {
-            max-width: 800px;
-            margin: 0 auto;
-            padding: 20px;
-            background: white;
-            border-radius: 10px;
-            box-shadow: 0 2px 10px rgba(0,0,0,0.1);
-        }
-        .metadata {
-            background: #f8f9fa;
-            padding: 15px;
-            border-radius: 8px;
-            margin: 15px 0;
-            border-left: 4px solid #007bff;
-        }
-        .content {
-            line-height: 1.6;
-            color: #333;
-        }
-        """
+        css=_APP_CSS
     ) as app:
         
         gr.Markdown("# 📰 Newsletter Agent - Smart Newsletter Generator")
@@ -264,25 +346,25 @@ This newsletter focuses on the latest developments and important trends in {topi
                         
                         style_select = gr.Dropdown(
                             label="✍️ Writing style",
-                            choices=["professional", "casual", "academic", "creative"],
+                            choices=list(STYLES),
                             value="professional"
                         )
                         
                         length_select = gr.Dropdown(
                             label="📄 Content length",
-                            choices=["short", "medium", "long"],
+                            choices=list(LENGTHS),
                             value="medium"
                         )
                         
                         audience_select = gr.Dropdown(
                             label="👥 Target audience",
-                            choices=["general", "tech", "business", "academic"],
+                            choices=list(AUDIENCES),
                             value="general"
                         )
                         
                         categories_select = gr.CheckboxGroup(
                             label="🏷️ Categories",
-                            choices=["Technology", "Business", "Health", "Entertainment", "Sports", "Politics", "Education"],
+                            choices=list(CATEGORIES),
                             value=["Technology", "Business"]
                         )
                         
@@ -308,7 +390,9 @@ This newsletter focuses on the latest developments and important trends in {topi
                 
                 # Bind events
                 generate_btn.click(
-                    fn=generate_complete_newsletter,
+                    fn=generate_newsletter_batch,
+                    batch=True,
+                    max_batch_size=MAX_BATCH_SIZE,
                     inputs=[
                         topic_input,
                         style_select,
@@ -337,33 +421,7 @@ This newsletter focuses on the latest developments and important trends in {topi
             
             # Usage Guide tab
             with gr.TabItem("📖 Usage Guide"):
-                gr.Markdown("""
-                ## 🎯 Usage Steps
-                
-                1. **Select Topic** - Enter your topic of interest in the "Newsletter topic" field
-                2. **Set Preferences** - Choose writing style, content length and target audience
-                3. **Select Categories** - Check the content categories you're interested in
-                4. **Generate Newsletter** - Click the "Generate Newsletter" button to create
-                5. **View Results** - Check the generated newsletter in HTML Preview or Markdown tabs
-                
-                ## 🔧 Features
-                
-                - ✅ **Smart Generation** - Automatically generates personalized newsletters using AI
-                - ✅ **Multiple Styles** - Supports professional, casual, academic and creative writing styles  
-                - ✅ **Content Customization** - Adjustable content length and target audience
-                - ✅ **Multiple Output Formats** - Supports both HTML and Markdown output
-                - ✅ **Real-time Generation** - Fast response with immediate results
-                
-                ## 💡 Tips
-                
-                - **Topic Suggestions**: Use specific topic descriptions like "AI applications in healthcare"
-                - **Style Selection**: Choose appropriate style based on your readers
-                - **Category Filtering**: Selecting relevant categories helps generate more precise content
-                
-                ## 🚀 Getting Started
-                
-                Switch to the "Generate Newsletter" tab now to create your first smart newsletter!
-                """)
+                gr.Markdown(_USAGE_GUIDE_MD)
         
         gr.Markdown("---")
         gr.Markdown("*Powered by Newsletter Agent | AI-Driven Newsletter Generation*")
@@ -6,17 +6,29 @@ User preferences, subscription management, personalization settings
 
 from .preferences import UserPreferencesManager, UserPreferences
 from .subscription import SubscriptionManager, Subscription
-from .storage import UserDataStorage
+from .storage import UserDataStorage, SQLiteUserDataStorage
 
 __all__ = [
     'UserPreferencesManager',
     'UserPreferences',
     'SubscriptionManager',
     'Subscription',
-    'UserDataStorage'
+    'UserDataStorage',
+    'SQLiteUserDataStorage'
 ]
 
-# 全局实例
-user_preferences_manager = UserPreferencesManager()
-subscription_manager = SubscriptionManager()
-user_storage = UserDataStorage()
+# 全局实例（首次访问时创建）
+_GLOBAL_FACTORIES = {
+    'user_preferences_manager': UserPreferencesManager,
+    'subscription_manager': SubscriptionManager,
+    'user_storage': UserDataStorage,
+}
+
+
+def __getattr__(name):
+    factory = _GLOBAL_FACTORIES.get(name)
+    if factory is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    instance = factory()
+    globals()[name] = instance
+    return instance
@@ -0,0 +1,15 @@
+# -*- coding: utf-8 -*-
+"""
+Newsletter Agent - 日志工具
+未安装loguru时使用的标准库logging适配器
+"""
+
+import logging
+
+
+class BraceStyleAdapter(logging.LoggerAdapter):
+    """兼容loguru的 {} 占位参数，仅在级别启用时格式化"""
+    
+    def log(self, level, msg, *args, **kwargs):
+        if self.isEnabledFor(level):
+            self.logger.log(level, msg.format(*args) if args else msg, **kwargs)
@@ -15,6 +15,24 @@ except ImportError:
     import logging
     logger = logging.getLogger(__name__)
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    from ciso8601 import parse_datetime as _parse_dt
+except ImportError:
+    _parse_dt = datetime.fromisoformat
+
+
+# 可选内容风格与长度（界面下拉框与校验共用）
+STYLES = ("professional", "casual", "academic", "creative")
+LENGTHS = ("short", "medium", "long")
+
+_VALID_STYLES = frozenset(STYLES)
+_VALID_LENGTHS = frozenset(LENGTHS)
+
 
 @dataclass
 class UserPreferences:
@@ -81,11 +99,24 @@ class UserPreferences:
         """从字典创建实例"""
         # 转换ISO字符串为datetime
         if data.get('created_at'):
-            data['created_at'] = datetime.fromisoformat(data['created_at'])
+            data['created_at'] = _parse_dt(data['created_at'])
         if data.get('updated_at'):
-            data['updated_at'] = datetime.fromisoformat(data['updated_at'])
+            data['updated_at'] = _parse_dt(data['updated_at'])
         
         return cls(**data)
+    
+    @classmethod
+    def from_dict_many(cls, items: List[Dict[str, Any]]) -> List['UserPreferences']:
+        """批量从字典创建实例（用于启动时批量加载）"""
+        parse_dt = _parse_dt
+        result = []
+        for data in items:
+            if data.get('created_at'):
+                data['created_at'] = parse_dt(data['created_at'])
+            if data.get('updated_at'):
+                data['updated_at'] = parse_dt(data['updated_at'])
+            result.append(cls(**data))
+        return result
 
 
 class UserPreferencesManager:
@@ -236,16 +267,14 @@ class UserPreferencesManager:
             errors['frequency'] = f"频率必须是: {', '.join(valid_frequencies)}"
         
         # 验证内容长度
-        valid_lengths = ['short', 'medium', 'long']
         content_length = preferences_data.get('content_length', 'medium')
-        if content_length not in valid_lengths:
-            errors['content_length'] = f"内容长度必须是: {', '.join(valid_lengths)}"
+        if content_length not in _VALID_LENGTHS:
+            errors['content_length'] = f"内容长度必须是: {', '.join(LENGTHS)}"
         
         # 验证风格
-        valid_styles = ['professional', 'casual', 'academic', 'creative']
         content_style = preferences_data.get('content_style', 'professional')
-        if content_style not in valid_styles:
-            errors['content_style'] = f"内容风格必须是: {', '.join(valid_styles)}"
+        if content_style not in _VALID_STYLES:
+            errors['content_style'] = f"内容风格必须是: {', '.join(STYLES)}"
         
         return errors
     
@@ -291,6 +320,30 @@ class UserPreferencesManager:
             logger.error(f"导入用户偏好失败: {e}")
             return None
     
+    def export_preferences_binary(self, user_id: str) -> Optional[bytes]:
+        """导出用户偏好为紧凑的UTF-8 JSON字节（供进程间内部复制，面向用户的导出请用JSON字符串）"""
+        preferences = self.get_user_preferences(user_id)
+        if not preferences:
+            return None
+        
+        data = preferences.to_dict()
+        if orjson is not None:
+            return orjson.dumps(data)
+        return json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    
+    def import_preferences_binary(self, buf: bytes) -> Optional[UserPreferences]:
+        """从 export_preferences_binary 导出的字节导入用户偏好"""
+        try:
+            data = orjson.loads(buf) if orjson is not None else json.loads(buf)
+            if not isinstance(data, dict):
+                raise TypeError(f"不支持的偏好数据类型: {type(data).__name__}")
+            preferences = UserPreferences.from_dict(data)
+            self.preferences_cache[preferences.user_id] = preferences
+            return preferences
+        except Exception as e:
+            logger.error(f"导入用户偏好失败: {e}")
+            return None
+    
     def get_all_available_topics(self) -> List[str]:
         """获取所有可用话题"""
         return self.default_topics
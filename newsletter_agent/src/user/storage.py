@@ -4,9 +4,16 @@ Newsletter Agent - 用户数据存储
 用户偏好和订阅数据的持久化存储
 """
 
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, BinaryIO, Iterator, Set, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing, contextmanager
+import copy
+import gzip
 import json
+import mmap
 import os
+import sqlite3
+import threading
 from pathlib import Path
 from datetime import datetime
 
@@ -14,12 +21,208 @@ try:
     from loguru import logger
 except ImportError:
     import logging
-    logger = logging.getLogger(__name__)
+    from .logging_utils import BraceStyleAdapter
+    logger = BraceStyleAdapter(logging.getLogger(__name__), {})
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+# 超过该大小的文件通过mmap读取
+_MMAP_THRESHOLD = 64 * 1024
+
+# 并行读取文件的线程数（文件IO期间释放GIL）
+_IO_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+
+# 写文件缓冲区大小
+_WRITE_BUFFER_SIZE = 64 * 1024
+_BACKUP_BUFFER_SIZE = 1 << 20
+
+# 压缩备份的压缩级别
+_ZSTD_LEVEL = 3
+_GZIP_LEVEL = 6
+
+# JSON备份文件扩展名（未压缩 / gzip / zstd）
+_JSON_BACKUP_SUFFIXES = ('.json', '.json.gz', '.json.zst')
+
+# 保存时复用的payload字典数量上限
+_DICT_POOL_SIZE = 64
+
+# 备份时每批并行读取的文件数（限制内存中的文件内容）
+_BACKUP_READ_BATCH = _IO_WORKERS * 4
+
+# 调试时可设置 NEWSLETTER_PRETTY=1 输出带缩进的JSON
+_PRETTY_JSON = bool(os.getenv("NEWSLETTER_PRETTY"))
+
+# 标准库json的序列化参数（未安装orjson时使用）
+if _PRETTY_JSON:
+    _DUMP_OPTS = dict(ensure_ascii=False, indent=2)
+else:
+    _DUMP_OPTS = dict(ensure_ascii=False, separators=(',', ':'))
+
+
+def _encode_json(data: Any) -> bytes:
+    """序列化为UTF-8编码的JSON字节（默认紧凑格式）"""
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS
+        if _PRETTY_JSON:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(data, option=option)
+    return json.dumps(data, **_DUMP_OPTS).encode('utf-8')
+
+
+def _decode_json(buf: bytes) -> Any:
+    """解析JSON字节"""
+    if orjson is not None:
+        return orjson.loads(buf)
+    return json.loads(buf)
+
+
+def _read_json_file(file_path: Path) -> Any:
+    """读取并解析JSON文件（大文件通过mmap直接解析，避免整体拷贝）"""
+    with open(file_path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size < _MMAP_THRESHOLD:
+            return _decode_json(f.read())
+        
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            if orjson is not None:
+                with memoryview(mm) as view:
+                    return orjson.loads(view)
+            return json.loads(mm[:])
+
+
+def _strip_backup_suffix(file_name: str, suffixes: Tuple[str, ...]) -> Optional[str]:
+    """去掉备份文件扩展名得到备份名，扩展名不匹配时返回None"""
+    for suffix in suffixes:
+        if file_name.endswith(suffix):
+            return file_name[:-len(suffix)]
+    return None
+
+
+def _compressed_suffix() -> str:
+    """压缩备份使用的扩展名（优先zstd，未安装时使用gzip）"""
+    return '.json.zst' if zstandard is not None else '.json.gz'
+
+
+@contextmanager
+def _compressing_writer(out: BinaryIO, suffix: str) -> Iterator[BinaryIO]:
+    """按扩展名包装输出流，写入时压缩"""
+    if suffix == '.json.zst':
+        compressor = zstandard.ZstdCompressor(level=_ZSTD_LEVEL, threads=-1)
+        with compressor.stream_writer(out, closefd=False) as writer:
+            yield writer
+    elif suffix == '.json.gz':
+        with gzip.GzipFile(fileobj=out, mode='wb', compresslevel=_GZIP_LEVEL) as writer:
+            yield writer
+    else:
+        yield out
+
+
+def _read_backup_file(file_path: Path) -> Any:
+    """读取并解析备份文件（按扩展名解压）"""
+    name = file_path.name
+    if name.endswith('.json.zst'):
+        if zstandard is None:
+            raise RuntimeError("读取 .json.zst 备份需要安装 zstandard")
+        with open(file_path, 'rb') as f, zstandard.ZstdDecompressor().stream_reader(f) as reader:
+            return _decode_json(reader.read())
+    if name.endswith('.json.gz'):
+        with gzip.open(file_path, 'rb') as f:
+            return _decode_json(f.read())
+    return _read_json_file(file_path)
+
+
+@contextmanager
+def _atomic_open(file_path: Path, buffering: int = _WRITE_BUFFER_SIZE) -> Iterator[BinaryIO]:
+    """打开临时文件写入，成功后 os.replace 到目标路径，避免中途崩溃留下损坏文件（不做fsync）"""
+    tmp_path = file_path.with_name(f"{file_path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        with open(tmp_path, 'wb', buffering=buffering) as f:
+            yield f
+        os.replace(tmp_path, file_path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def _atomic_write(file_path: Path, data_bytes: bytes) -> None:
+    """原子写入文件"""
+    with _atomic_open(file_path) as f:
+        f.write(data_bytes)
+
+
+def _write_json_file(file_path: Path, data: Any) -> None:
+    """原子写入JSON文件"""
+    _atomic_write(file_path, _encode_json(data))
+
+
+def _fsync_dir(directory: Path) -> None:
+    """同步目录元数据，使批量 os.replace 落盘（不支持的平台上跳过）"""
+    try:
+        fd = os.open(directory, os.O_RDONLY | getattr(os, 'O_DIRECTORY', 0))
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def _read_raw_record(path: str) -> Optional[bytes]:
+    """读取记录文件原始字节，内容无效时返回None"""
+    try:
+        with open(path, 'rb') as f:
+            raw = f.read()
+        if _decode_json(raw):
+            return raw
+    except Exception as e:
+        logger.warning("跳过无法读取的文件 {}: {}", path, e)
+    return None
+
+
+def _is_valid_record(raw: bytes) -> bool:
+    """记录内容是否为非空JSON对象（解析失败时抛出异常）"""
+    data = _decode_json(raw)
+    return bool(data) and isinstance(data, dict)
+
+
+def _check_record_file(path: str) -> bool:
+    """读取记录文件并校验内容"""
+    with open(path, 'rb') as f:
+        return _is_valid_record(f.read())
+
+
+def _scan_dir(directory: Path, suffixes: Tuple[str, ...] = ('.json',)) -> Tuple[int, int]:
+    """遍历目录，返回 (指定扩展名的文件数, 全部文件总字节数)"""
+    count = 0
+    size = 0
+    with os.scandir(directory) as it:
+        for entry in it:
+            if entry.is_file():
+                size += entry.stat().st_size
+                if entry.name.endswith(suffixes):
+                    count += 1
+    return count, size
 
 
 class UserDataStorage:
     """用户数据存储管理器"""
     
+    # 备份文件扩展名
+    _backup_suffixes: Tuple[str, ...] = _JSON_BACKUP_SUFFIXES
+    
     def __init__(self, data_dir: Optional[str] = None):
         # 设置数据目录
         if data_dir is None:
@@ -34,7 +237,17 @@ class UserDataStorage:
         self.subscriptions_dir = self.data_dir / "subscriptions"
         self.backups_dir = self.data_dir / "backups"
         
+        # 已加载数据缓存: ID -> (st_mtime_ns, st_size, 数据)
+        self._pref_cache: Dict[str, Tuple[int, int, Any]] = {}
+        self._sub_cache: Dict[str, Tuple[int, int, Any]] = {}
+        
+        # 保存时复用的payload字典
+        self._dict_pool: List[Dict[str, Any]] = []
+        
         self._ensure_directories()
+        
+        self._open_store()
+        
         logger.info(f"用户数据存储初始化: {self.data_dir}")
     
     def _ensure_directories(self):
@@ -42,18 +255,108 @@ class UserDataStorage:
         for directory in [self.data_dir, self.preferences_dir, self.subscriptions_dir, self.backups_dir]:
             directory.mkdir(parents=True, exist_ok=True)
     
+    def _open_store(self):
+        """初始化存储后端附加结构（文件存储: 内存中的 邮箱 -> 订阅ID 索引及反向映射）"""
+        self._email_index: Dict[str, Set[str]] = {}
+        self._subscription_emails: Dict[str, str] = {}
+        # 构建索引时订阅目录的 st_mtime_ns，与当前目录不一致时索引需重建（None表示尚未构建）
+        self._email_index_mtime_ns: Optional[int] = None
+    
+    def _subscriptions_mtime_ns(self) -> int:
+        """订阅目录的修改时间（任何进程新建/替换/删除订阅文件都会改变）"""
+        return os.stat(self.subscriptions_dir).st_mtime_ns
+    
+    def _index_subscription_email(self, subscription_id: str, email: Optional[str]):
+        """更新订阅的邮箱索引"""
+        old_email = self._subscription_emails.get(subscription_id)
+        if old_email == email:
+            return
+        
+        if old_email is not None:
+            ids = self._email_index.get(old_email)
+            if ids is not None:
+                ids.discard(subscription_id)
+                if not ids:
+                    del self._email_index[old_email]
+            del self._subscription_emails[subscription_id]
+        
+        if email is not None:
+            self._email_index.setdefault(email, set()).add(subscription_id)
+            self._subscription_emails[subscription_id] = email
+    
+    @contextmanager
+    def _updating_email_index(self, subscription_id: str, email: Optional[str]) -> Iterator[None]:
+        """包裹订阅文件的写入/删除，成功后增量更新索引
+        
+        仅当写入前索引与订阅目录一致时才增量更新；否则（其他实例修改过目录）
+        保持过期状态，下次查找时重建。
+        """
+        fresh = self._email_index_mtime_ns == self._subscriptions_mtime_ns()
+        yield
+        if fresh:
+            self._index_subscription_email(subscription_id, email)
+            self._email_index_mtime_ns = self._subscriptions_mtime_ns()
+    
+    def rebuild_email_index(self):
+        """扫描全部订阅文件重建邮箱索引"""
+        # 扫描前记录目录mtime，扫描期间的修改会使索引在下次查找时再次重建
+        mtime_ns = self._subscriptions_mtime_ns()
+        self._email_index.clear()
+        self._subscription_emails.clear()
+        for subscription_id, path in self._iter_json_files(self.subscriptions_dir):
+            try:
+                subscription_data = _read_json_file(path)
+            except Exception as e:
+                logger.warning(f"跳过无法读取的文件 {path}: {e}")
+                continue
+            if isinstance(subscription_data, dict) and subscription_data.get('email'):
+                self._index_subscription_email(subscription_id, subscription_data['email'])
+        self._email_index_mtime_ns = mtime_ns
+    
+    @staticmethod
+    def _load_cached(cache: Dict[str, Tuple[int, int, Any]], record_id: str, file_path: Path) -> Optional[Any]:
+        """按文件mtime/大小校验缓存，未变化时返回已解析数据的深拷贝"""
+        try:
+            st = os.stat(file_path)
+        except FileNotFoundError:
+            cache.pop(record_id, None)
+            return None
+        
+        hit = cache.get(record_id)
+        if hit is not None and hit[0] == st.st_mtime_ns and hit[1] == st.st_size:
+            return copy.deepcopy(hit[2])
+        
+        data = _read_json_file(file_path)
+        cache[record_id] = (st.st_mtime_ns, st.st_size, data)
+        return copy.deepcopy(data)
+    
+    @contextmanager
+    def _stamped_payload(self, data: Dict[str, Any], saved_at: str) -> Iterator[Dict[str, Any]]:
+        """从字典池取出字典，填入数据和保存时间戳（不修改调用方传入的字典）"""
+        try:
+            payload = self._dict_pool.pop()
+        except IndexError:
+            payload = {}
+        payload.update(data)
+        payload['saved_at'] = saved_at
+        try:
+            yield payload
+        finally:
+            payload.clear()
+            if len(self._dict_pool) < _DICT_POOL_SIZE:
+                self._dict_pool.append(payload)
+    
     def save_user_preferences(self, user_id: str, preferences_data: Dict[str, Any]) -> bool:
         """保存用户偏好"""
+        saved_at = datetime.now().isoformat()
         try:
             file_path = self.preferences_dir / f"{user_id}.json"
             
-            # 添加保存时间戳
-            preferences_data['saved_at'] = datetime.now().isoformat()
+            with self._stamped_payload(preferences_data, saved_at) as payload:
+                _write_json_file(file_path, payload)
+            self._pref_cache.pop(user_id, None)
             
-            with open(file_path, 'w', encoding='utf-8') as f:
-                json.dump(preferences_data, f, ensure_ascii=False, indent=2)
-            
-            logger.info(f"保存用户偏好: {user_id}")
+            logger.debug("保存用户偏好: {}", user_id)
             return True
             
         except Exception as e:
@@ -65,13 +368,11 @@ class UserDataStorage:
         try:
             file_path = self.preferences_dir / f"{user_id}.json"
             
-            if not file_path.exists():
+            preferences_data = self._load_cached(self._pref_cache, user_id, file_path)
+            if preferences_data is None:
                 return None
             
-            with open(file_path, 'r', encoding='utf-8') as f:
-                preferences_data = json.load(f)
-            
-            logger.info(f"加载用户偏好: {user_id}")
+            logger.debug("加载用户偏好: {}", user_id)
             return preferences_data
             
         except Exception as e:
@@ -83,9 +384,11 @@ class UserDataStorage:
         try:
             file_path = self.preferences_dir / f"{user_id}.json"
             
+            self._pref_cache.pop(user_id, None)
+            
             if file_path.exists():
                 file_path.unlink()
-                logger.info(f"删除用户偏好: {user_id}")
+                logger.debug("删除用户偏好: {}", user_id)
                 return True
             else:
                 logger.warning(f"用户偏好文件不存在: {user_id}")
@@ -97,16 +400,16 @@ class UserDataStorage:
     
     def save_subscription(self, subscription_id: str, subscription_data: Dict[str, Any]) -> bool:
         """保存订阅数据"""
+        saved_at = datetime.now().isoformat()
         try:
             file_path = self.subscriptions_dir / f"{subscription_id}.json"
             
-            # 添加保存时间戳
-            subscription_data['saved_at'] = datetime.now().isoformat()
-            
-            with open(file_path, 'w', encoding='utf-8') as f:
-                json.dump(subscription_data, f, ensure_ascii=False, indent=2)
+            with self._updating_email_index(subscription_id, subscription_data.get('email') or None), \
+                    self._stamped_payload(subscription_data, saved_at) as payload:
+                _write_json_file(file_path, payload)
+            self._sub_cache.pop(subscription_id, None)
             
-            logger.info(f"保存订阅数据: {subscription_id}")
+            logger.debug("保存订阅数据: {}", subscription_id)
             return True
             
         except Exception as e:
@@ -118,13 +421,11 @@ class UserDataStorage:
         try:
             file_path = self.subscriptions_dir / f"{subscription_id}.json"
             
-            if not file_path.exists():
+            subscription_data = self._load_cached(self._sub_cache, subscription_id, file_path)
+            if subscription_data is None:
                 return None
             
-            with open(file_path, 'r', encoding='utf-8') as f:
-                subscription_data = json.load(f)
-            
-            logger.info(f"加载订阅数据: {subscription_id}")
+            logger.debug("加载订阅数据: {}", subscription_id)
             return subscription_data
             
         except Exception as e:
@@ -136,9 +437,15 @@ class UserDataStorage:
         try:
             file_path = self.subscriptions_dir / f"{subscription_id}.json"
             
-            if file_path.exists():
-                file_path.unlink()
-                logger.info(f"删除订阅数据: {subscription_id}")
+            self._sub_cache.pop(subscription_id, None)
+            
+            with self._updating_email_index(subscription_id, None):
+                existed = file_path.exists()
+                if existed:
+                    file_path.unlink()
+            
+            if existed:
+                logger.debug("删除订阅数据: {}", subscription_id)
                 return True
             else:
                 logger.warning(f"订阅数据文件不存在: {subscription_id}")
@@ -148,15 +455,79 @@ class UserDataStorage:
             logger.error(f"删除订阅数据失败 {subscription_id}: {e}")
             return False
     
+    def bulk_create(self, user_id: str, preferences_data: Dict[str, Any],
+                    subscription_id: str, subscription_data: Dict[str, Any]) -> bool:
+        """一次保存同一用户的偏好和订阅（共用时间戳，订阅写入失败时恢复原有偏好）"""
+        saved_at = datetime.now().isoformat()
+        pref_path = self.preferences_dir / f"{user_id}.json"
+        sub_path = self.subscriptions_dir / f"{subscription_id}.json"
+        try:
+            try:
+                old_pref_bytes = pref_path.read_bytes()
+            except FileNotFoundError:
+                old_pref_bytes = None
+            
+            with self._stamped_payload(preferences_data, saved_at) as payload:
+                _write_json_file(pref_path, payload)
+            self._pref_cache.pop(user_id, None)
+            try:
+                with self._updating_email_index(subscription_id, subscription_data.get('email') or None), \
+                        self._stamped_payload(subscription_data, saved_at) as payload:
+                    _write_json_file(sub_path, payload)
+            except Exception:
+                if old_pref_bytes is None:
+                    pref_path.unlink(missing_ok=True)
+                else:
+                    _atomic_write(pref_path, old_pref_bytes)
+                self._pref_cache.pop(user_id, None)
+                raise
+            self._sub_cache.pop(subscription_id, None)
+            
+            logger.debug("保存用户及订阅: {} / {}", user_id, subscription_id)
+            return True
+            
+        except Exception as e:
+            logger.error(f"保存用户及订阅失败 {user_id}: {e}")
+            return False
+    
+    @staticmethod
+    def _iter_json_files(directory: Path) -> Iterator[Tuple[str, str]]:
+        """遍历目录中的JSON文件，返回 (记录ID, 文件路径)"""
+        with os.scandir(directory) as it:
+            for entry in it:
+                if entry.name.endswith('.json') and entry.is_file():
+                    yield entry.name[:-5], entry.path
+    
+    def _iter_raw_records(self, directory: Path, executor: ThreadPoolExecutor) -> Iterator[Tuple[str, bytes]]:
+        """并行读取目录中有效的JSON记录，按目录顺序返回 (记录ID, 原始字节)"""
+        files = list(self._iter_json_files(directory))
+        for start in range(0, len(files), _BACKUP_READ_BATCH):
+            batch = files[start:start + _BACKUP_READ_BATCH]
+            raws = executor.map(_read_raw_record, [path for _, path in batch])
+            for (record_id, _), raw in zip(batch, raws):
+                if raw is not None:
+                    yield record_id, raw
+    
+    def _iter_backup_files(self) -> Iterator[Tuple[str, str, os.stat_result]]:
+        """遍历JSON备份文件（含压缩备份），返回 (备份名, 文件路径, stat结果)"""
+        with os.scandir(self.backups_dir) as it:
+            for entry in it:
+                name = _strip_backup_suffix(entry.name, _JSON_BACKUP_SUFFIXES)
+                if name is not None and entry.is_file():
+                    yield name, entry.path, entry.stat()
+    
+    def _find_backup_path(self, backup_name: str) -> Optional[Path]:
+        """查找JSON备份文件（未压缩或压缩）"""
+        for suffix in _JSON_BACKUP_SUFFIXES:
+            backup_path = self.backups_dir / f"{backup_name}{suffix}"
+            if backup_path.exists():
+                return backup_path
+        return None
+    
     def list_all_users(self) -> List[str]:
         """列出所有用户ID"""
         try:
-            user_ids = []
-            for file_path in self.preferences_dir.glob("*.json"):
-                user_id = file_path.stem  # 文件名（不含扩展名）
-                user_ids.append(user_id)
-            
-            return user_ids
+            return [user_id for user_id, _ in self._iter_json_files(self.preferences_dir)]
             
         except Exception as e:
             logger.error(f"列出用户失败: {e}")
@@ -165,47 +536,37 @@ class UserDataStorage:
     def list_all_subscriptions(self) -> List[str]:
         """列出所有订阅ID"""
         try:
-            subscription_ids = []
-            for file_path in self.subscriptions_dir.glob("*.json"):
-                subscription_id = file_path.stem
-                subscription_ids.append(subscription_id)
-            
-            return subscription_ids
+            return [subscription_id for subscription_id, _ in self._iter_json_files(self.subscriptions_dir)]
             
         except Exception as e:
             logger.error(f"列出订阅失败: {e}")
             return []
     
-    def create_backup(self, backup_name: Optional[str] = None) -> bool:
-        """创建数据备份"""
+    def create_backup(self, backup_name: Optional[str] = None, compress: bool = False) -> bool:
+        """创建数据备份（compress=True 时写入zstd压缩备份，未安装zstandard时使用gzip）"""
+        now = datetime.now()
         try:
             if backup_name is None:
-                backup_name = f"backup_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
-            
-            backup_path = self.backups_dir / f"{backup_name}.json"
-            
-            # 收集所有数据
-            backup_data = {
-                'created_at': datetime.now().isoformat(),
-                'preferences': {},
-                'subscriptions': {}
-            }
+                backup_name = f"backup_{now.strftime('%Y%m%d_%H%M%S')}"
             
-            # 备份用户偏好
-            for user_id in self.list_all_users():
-                preferences = self.load_user_preferences(user_id)
-                if preferences:
-                    backup_data['preferences'][user_id] = preferences
+            suffix = _compressed_suffix() if compress else '.json'
+            backup_path = self.backups_dir / f"{backup_name}{suffix}"
             
-            # 备份订阅数据
-            for subscription_id in self.list_all_subscriptions():
-                subscription = self.load_subscription(subscription_id)
-                if subscription:
-                    backup_data['subscriptions'][subscription_id] = subscription
-            
-            # 保存备份文件
-            with open(backup_path, 'w', encoding='utf-8') as f:
-                json.dump(backup_data, f, ensure_ascii=False, indent=2)
+            # 各文件内容原样流式写入备份（只做解析校验，不重新序列化）
+            with _atomic_open(backup_path, _BACKUP_BUFFER_SIZE) as raw_out, \
+                    _compressing_writer(raw_out, suffix) as out, \
+                    ThreadPoolExecutor(max_workers=_IO_WORKERS) as executor:
+                out.write(b'{"created_at":' + _encode_json(now.isoformat()))
+                for section, directory in (('preferences', self.preferences_dir),
+                                           ('subscriptions', self.subscriptions_dir)):
+                    out.write(b',"' + section.encode() + b'":{')
+                    separator = b''
+                    for record_id, raw in self._iter_raw_records(directory, executor):
+                        out.write(separator + _encode_json(record_id) + b':')
+                        out.write(raw)
+                        separator = b','
+                    out.write(b'}')
+                out.write(b'}')
             
             logger.info(f"创建数据备份: {backup_name}")
             return True
@@ -217,14 +578,13 @@ class UserDataStorage:
     def restore_backup(self, backup_name: str) -> bool:
         """恢复数据备份"""
         try:
-            backup_path = self.backups_dir / f"{backup_name}.json"
+            backup_path = self._find_backup_path(backup_name)
             
-            if not backup_path.exists():
+            if backup_path is None:
                 logger.error(f"备份文件不存在: {backup_name}")
                 return False
             
-            with open(backup_path, 'r', encoding='utf-8') as f:
-                backup_data = json.load(f)
+            backup_data = _read_backup_file(backup_path)
             
             # 恢复用户偏好
             restored_preferences = 0
@@ -238,6 +598,10 @@ class UserDataStorage:
                 if self.save_subscription(subscription_id, subscription):
                     restored_subscriptions += 1
             
+            # 单个文件写入不做fsync，整批完成后统一同步目录
+            for directory in (self.preferences_dir, self.subscriptions_dir, self.data_dir):
+                _fsync_dir(directory)
+            
             logger.info(f"恢复备份成功: {backup_name} (偏好: {restored_preferences}, 订阅: {restored_subscriptions})")
             return True
             
@@ -249,24 +613,23 @@ class UserDataStorage:
         """列出所有备份"""
         try:
             backups = []
-            for file_path in self.backups_dir.glob("*.json"):
+            for name, file_path, st in self._iter_backup_files():
                 backup_info = {
-                    'name': file_path.stem,
-                    'file_path': str(file_path),
-                    'size': file_path.stat().st_size,
-                    'created_at': datetime.fromtimestamp(file_path.stat().st_mtime).isoformat()
+                    'name': name,
+                    'file_path': file_path,
+                    'size': st.st_size,
+                    'created_at': datetime.fromtimestamp(st.st_mtime).isoformat()
                 }
                 
                 # 尝试读取备份的创建时间
                 try:
-                    with open(file_path, 'r', encoding='utf-8') as f:
-                        backup_data = json.load(f)
-                        if 'created_at' in backup_data:
-                            backup_info['created_at'] = backup_data['created_at']
-                        
-                        # 添加统计信息
-                        backup_info['preferences_count'] = len(backup_data.get('preferences', {}))
-                        backup_info['subscriptions_count'] = len(backup_data.get('subscriptions', {}))
+                    backup_data = _read_backup_file(Path(file_path))
+                    if 'created_at' in backup_data:
+                        backup_info['created_at'] = backup_data['created_at']
+                    
+                    # 添加统计信息
+                    backup_info['preferences_count'] = len(backup_data.get('preferences', {}))
+                    backup_info['subscriptions_count'] = len(backup_data.get('subscriptions', {}))
                 except:
                     pass  # 忽略读取错误
                 
@@ -283,21 +646,10 @@ class UserDataStorage:
     def get_storage_statistics(self) -> Dict[str, Any]:
         """获取存储统计信息"""
         try:
-            users_count = len(self.list_all_users())
-            subscriptions_count = len(self.list_all_subscriptions())
-            backups_count = len(self.list_backups())
-            
-            # 计算目录大小
-            def get_dir_size(path: Path) -> int:
-                total_size = 0
-                for file_path in path.rglob('*'):
-                    if file_path.is_file():
-                        total_size += file_path.stat().st_size
-                return total_size
-            
-            preferences_size = get_dir_size(self.preferences_dir)
-            subscriptions_size = get_dir_size(self.subscriptions_dir)
-            backups_size = get_dir_size(self.backups_dir)
+            # 每个目录只遍历一次，同时统计JSON文件数和总大小
+            users_count, preferences_size = _scan_dir(self.preferences_dir)
+            subscriptions_count, subscriptions_size = _scan_dir(self.subscriptions_dir)
+            backups_count, backups_size = _scan_dir(self.backups_dir, _JSON_BACKUP_SUFFIXES)
             total_size = preferences_size + subscriptions_size + backups_size
             
             return {
@@ -318,10 +670,33 @@ class UserDataStorage:
             logger.error(f"获取存储统计失败: {e}")
             return {}
     
+    def list_backups_meta(self) -> List[Dict[str, Any]]:
+        """列出所有备份的文件信息（只读取目录项，不解析备份内容），按修改时间倒序"""
+        try:
+            backups = []
+            with os.scandir(self.backups_dir) as it:
+                for entry in it:
+                    name = _strip_backup_suffix(entry.name, self._backup_suffixes)
+                    if name is not None and entry.is_file():
+                        st = entry.stat()
+                        backups.append({
+                            'name': name,
+                            'file_path': entry.path,
+                            'size': st.st_size,
+                            'mtime': st.st_mtime
+                        })
+            
+            backups.sort(key=lambda x: x['mtime'], reverse=True)
+            return backups
+            
+        except Exception as e:
+            logger.error(f"列出备份失败: {e}")
+            return []
+    
     def cleanup_old_backups(self, keep_count: int = 10) -> int:
         """清理旧备份文件"""
         try:
-            backups = self.list_backups()
+            backups = self.list_backups_meta()
             
             if len(backups) <= keep_count:
                 return 0
@@ -342,21 +717,362 @@ class UserDataStorage:
             return 0
     
     def find_subscriptions_by_email(self, email: str) -> List[str]:
-        """根据邮箱查找订阅ID"""
+        """根据邮箱查找订阅ID（订阅目录在索引构建后被其他实例修改时先重建索引）"""
+        try:
+            if self._email_index_mtime_ns != self._subscriptions_mtime_ns():
+                self.rebuild_email_index()
+            return list(self._email_index.get(email, ()))
+        except Exception as e:
+            logger.error(f"查找订阅失败: {e}")
+            return []
+    
+    def validate_data_integrity(self) -> Dict[str, Any]:
+        """验证数据完整性"""
         try:
-            subscription_ids = []
+            results = {
+                'preferences': {'valid': 0, 'invalid': 0, 'errors': []},
+                'subscriptions': {'valid': 0, 'invalid': 0, 'errors': []},
+                'checked_at': datetime.now().isoformat()
+            }
+            
+            # 直接读取并校验文件内容（不经过 load_* 和缓存），并行读取，串行汇总
+            with ThreadPoolExecutor(max_workers=_IO_WORKERS) as executor:
+                checks = (
+                    ('preferences', self.preferences_dir, "无效的偏好数据"),
+                    ('subscriptions', self.subscriptions_dir, "无效的订阅数据"),
+                )
+                for section, directory, invalid_msg in checks:
+                    section_results = results[section]
+                    files = list(self._iter_json_files(directory))
+                    futures = [executor.submit(_check_record_file, path) for _, path in files]
+                    for (record_id, _), future in zip(files, futures):
+                        try:
+                            if future.result():
+                                section_results['valid'] += 1
+                            else:
+                                section_results['invalid'] += 1
+                                section_results['errors'].append(f"{invalid_msg}: {record_id}")
+                        except Exception as e:
+                            section_results['invalid'] += 1
+                            section_results['errors'].append(f"读取失败 {record_id}: {str(e)}")
+            
+            return results
             
-            for subscription_id in self.list_all_subscriptions():
-                subscription_data = self.load_subscription(subscription_id)
-                if subscription_data and subscription_data.get('email') == email:
-                    subscription_ids.append(subscription_id)
+        except Exception as e:
+            logger.error(f"数据完整性验证失败: {e}")
+            return {'error': str(e)} 
+
+
+_SQLITE_SCHEMA = """
+PRAGMA journal_mode=WAL;
+PRAGMA synchronous=NORMAL;
+CREATE TABLE IF NOT EXISTS prefs(id TEXT PRIMARY KEY, data BLOB NOT NULL);
+CREATE TABLE IF NOT EXISTS subs(id TEXT PRIMARY KEY, email TEXT, data BLOB NOT NULL);
+CREATE INDEX IF NOT EXISTS subs_email ON subs(email);
+"""
+
+
+class SQLiteUserDataStorage(UserDataStorage):
+    """基于SQLite的用户数据存储
+    
+    偏好和订阅分别保存在 data_dir/store.db 的 prefs / subs 表中，
+    接口与 UserDataStorage 一致；备份为 backups 目录下的 .db 文件。
+    """
+    
+    _backup_suffixes = _JSON_BACKUP_SUFFIXES + ('.db',)
+    
+    def _open_store(self):
+        """打开数据库连接并建表"""
+        self.db_path = self.data_dir / "store.db"
+        self._db_lock = threading.Lock()
+        self._db = sqlite3.connect(str(self.db_path), isolation_level=None, check_same_thread=False)
+        self._db.executescript(_SQLITE_SCHEMA)
+    
+    @contextmanager
+    def _updating_email_index(self, subscription_id: str, email: Optional[str]) -> Iterator[None]:
+        """subs.email 列随写入语句一起更新，无需额外维护索引"""
+        yield
+    
+    def _index_subscription_email(self, subscription_id: str, email: Optional[str]):
+        """subs.email 列随写入语句一起更新，无需额外维护索引"""
+    
+    def rebuild_email_index(self):
+        """重建 subs.email 上的数据库索引"""
+        self._execute("REINDEX subs_email")
+    
+    def _execute(self, sql: str, params: Tuple = ()) -> List[Tuple]:
+        with self._db_lock:
+            return self._db.execute(sql, params).fetchall()
+    
+    def close(self):
+        """关闭数据库连接"""
+        with self._db_lock:
+            self._db.close()
+    
+    def save_user_preferences(self, user_id: str, preferences_data: Dict[str, Any]) -> bool:
+        """保存用户偏好"""
+        saved_at = datetime.now().isoformat()
+        try:
+            with self._stamped_payload(preferences_data, saved_at) as payload:
+                data_bytes = _encode_json(payload)
+            self._execute(
+                "INSERT OR REPLACE INTO prefs(id, data) VALUES (?, ?)",
+                (user_id, data_bytes)
+            )
             
-            return subscription_ids
+            logger.debug("保存用户偏好: {}", user_id)
+            return True
             
+        except Exception as e:
+            logger.error(f"保存用户偏好失败 {user_id}: {e}")
+            return False
+    
+    def load_user_preferences(self, user_id: str) -> Optional[Dict[str, Any]]:
+        """加载用户偏好"""
+        try:
+            rows = self._execute("SELECT data FROM prefs WHERE id = ?", (user_id,))
+            if not rows:
+                return None
+            
+            logger.debug("加载用户偏好: {}", user_id)
+            return _decode_json(rows[0][0])
+            
+        except Exception as e:
+            logger.error(f"加载用户偏好失败 {user_id}: {e}")
+            return None
+    
+    def delete_user_preferences(self, user_id: str) -> bool:
+        """删除用户偏好"""
+        try:
+            with self._db_lock:
+                deleted = self._db.execute("DELETE FROM prefs WHERE id = ?", (user_id,)).rowcount
+            
+            if deleted:
+                logger.debug("删除用户偏好: {}", user_id)
+                return True
+            logger.warning(f"用户偏好不存在: {user_id}")
+            return False
+            
+        except Exception as e:
+            logger.error(f"删除用户偏好失败 {user_id}: {e}")
+            return False
+    
+    def save_subscription(self, subscription_id: str, subscription_data: Dict[str, Any]) -> bool:
+        """保存订阅数据"""
+        saved_at = datetime.now().isoformat()
+        try:
+            with self._stamped_payload(subscription_data, saved_at) as payload:
+                data_bytes = _encode_json(payload)
+            self._execute(
+                "INSERT OR REPLACE INTO subs(id, email, data) VALUES (?, ?, ?)",
+                (subscription_id, subscription_data.get('email'), data_bytes)
+            )
+            
+            logger.debug("保存订阅数据: {}", subscription_id)
+            return True
+            
+        except Exception as e:
+            logger.error(f"保存订阅数据失败 {subscription_id}: {e}")
+            return False
+    
+    def load_subscription(self, subscription_id: str) -> Optional[Dict[str, Any]]:
+        """加载订阅数据"""
+        try:
+            rows = self._execute("SELECT data FROM subs WHERE id = ?", (subscription_id,))
+            if not rows:
+                return None
+            
+            logger.debug("加载订阅数据: {}", subscription_id)
+            return _decode_json(rows[0][0])
+            
+        except Exception as e:
+            logger.error(f"加载订阅数据失败 {subscription_id}: {e}")
+            return None
+    
+    def delete_subscription(self, subscription_id: str) -> bool:
+        """删除订阅数据"""
+        try:
+            with self._db_lock:
+                deleted = self._db.execute("DELETE FROM subs WHERE id = ?", (subscription_id,)).rowcount
+            
+            if deleted:
+                logger.debug("删除订阅数据: {}", subscription_id)
+                return True
+            logger.warning(f"订阅数据不存在: {subscription_id}")
+            return False
+            
+        except Exception as e:
+            logger.error(f"删除订阅数据失败 {subscription_id}: {e}")
+            return False
+    
+    def bulk_create(self, user_id: str, preferences_data: Dict[str, Any],
+                    subscription_id: str, subscription_data: Dict[str, Any]) -> bool:
+        """在一个事务中保存同一用户的偏好和订阅"""
+        saved_at = datetime.now().isoformat()
+        try:
+            with self._stamped_payload(preferences_data, saved_at) as payload:
+                pref_bytes = _encode_json(payload)
+            with self._stamped_payload(subscription_data, saved_at) as payload:
+                sub_bytes = _encode_json(payload)
+            
+            with self._db_lock:
+                self._db.execute("BEGIN")
+                try:
+                    self._db.execute(
+                        "INSERT OR REPLACE INTO prefs(id, data) VALUES (?, ?)",
+                        (user_id, pref_bytes)
+                    )
+                    self._db.execute(
+                        "INSERT OR REPLACE INTO subs(id, email, data) VALUES (?, ?, ?)",
+                        (subscription_id, subscription_data.get('email'), sub_bytes)
+                    )
+                    self._db.execute("COMMIT")
+                except Exception:
+                    self._db.execute("ROLLBACK")
+                    raise
+            
+            logger.debug("保存用户及订阅: {} / {}", user_id, subscription_id)
+            return True
+            
+        except Exception as e:
+            logger.error(f"保存用户及订阅失败 {user_id}: {e}")
+            return False
+    
+    def list_all_users(self) -> List[str]:
+        """列出所有用户ID"""
+        try:
+            return [row[0] for row in self._execute("SELECT id FROM prefs")]
+        except Exception as e:
+            logger.error(f"列出用户失败: {e}")
+            return []
+    
+    def list_all_subscriptions(self) -> List[str]:
+        """列出所有订阅ID"""
+        try:
+            return [row[0] for row in self._execute("SELECT id FROM subs")]
+        except Exception as e:
+            logger.error(f"列出订阅失败: {e}")
+            return []
+    
+    def find_subscriptions_by_email(self, email: str) -> List[str]:
+        """根据邮箱查找订阅ID"""
+        try:
+            return [row[0] for row in self._execute("SELECT id FROM subs WHERE email = ?", (email,))]
         except Exception as e:
             logger.error(f"查找订阅失败: {e}")
             return []
     
+    def create_backup(self, backup_name: Optional[str] = None, compress: bool = False) -> bool:
+        """创建数据备份（VACUUM INTO 生成数据库快照，快照不压缩，忽略compress）"""
+        try:
+            if backup_name is None:
+                backup_name = f"backup_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+            
+            backup_path = self.backups_dir / f"{backup_name}.db"
+            self._execute("VACUUM INTO ?", (str(backup_path),))
+            
+            logger.info(f"创建数据备份: {backup_name}")
+            return True
+            
+        except Exception as e:
+            logger.error(f"创建备份失败: {e}")
+            return False
+    
+    def restore_backup(self, backup_name: str) -> bool:
+        """恢复数据备份（支持 .db 快照和JSON备份）"""
+        backup_path = self.backups_dir / f"{backup_name}.db"
+        if not backup_path.exists():
+            return super().restore_backup(backup_name)
+        
+        try:
+            with self._db_lock:
+                self._db.execute("ATTACH DATABASE ? AS backup", (str(backup_path),))
+                try:
+                    self._db.execute("BEGIN")
+                    restored_preferences = self._db.execute(
+                        "INSERT OR REPLACE INTO prefs SELECT id, data FROM backup.prefs"
+                    ).rowcount
+                    restored_subscriptions = self._db.execute(
+                        "INSERT OR REPLACE INTO subs SELECT id, email, data FROM backup.subs"
+                    ).rowcount
+                    self._db.execute("COMMIT")
+                except Exception:
+                    self._db.execute("ROLLBACK")
+                    raise
+                finally:
+                    self._db.execute("DETACH DATABASE backup")
+            
+            logger.info(f"恢复备份成功: {backup_name} (偏好: {restored_preferences}, 订阅: {restored_subscriptions})")
+            return True
+            
+        except Exception as e:
+            logger.error(f"恢复备份失败: {e}")
+            return False
+    
+    def list_backups(self) -> List[Dict[str, Any]]:
+        """列出所有备份（.db 快照和JSON备份）"""
+        backups = super().list_backups()
+        try:
+            with os.scandir(self.backups_dir) as it:
+                entries = [entry for entry in it if entry.name.endswith('.db') and entry.is_file()]
+            
+            for entry in entries:
+                st = entry.stat()
+                file_path = Path(entry.path)
+                backup_info = {
+                    'name': entry.name[:-3],
+                    'file_path': entry.path,
+                    'size': st.st_size,
+                    'created_at': datetime.fromtimestamp(st.st_mtime).isoformat()
+                }
+                
+                try:
+                    with closing(sqlite3.connect(f"{file_path.as_uri()}?mode=ro", uri=True)) as conn:
+                        backup_info['preferences_count'] = conn.execute("SELECT COUNT(*) FROM prefs").fetchone()[0]
+                        backup_info['subscriptions_count'] = conn.execute("SELECT COUNT(*) FROM subs").fetchone()[0]
+                except sqlite3.Error:
+                    pass  # 忽略读取错误
+                
+                backups.append(backup_info)
+            
+            backups.sort(key=lambda x: x['created_at'], reverse=True)
+            return backups
+            
+        except Exception as e:
+            logger.error(f"列出备份失败: {e}")
+            return backups
+    
+    def get_storage_statistics(self) -> Dict[str, Any]:
+        """获取存储统计信息"""
+        try:
+            (users_count, preferences_size), = self._execute(
+                "SELECT COUNT(*), COALESCE(SUM(LENGTH(data)), 0) FROM prefs"
+            )
+            (subscriptions_count, subscriptions_size), = self._execute(
+                "SELECT COUNT(*), COALESCE(SUM(LENGTH(data)), 0) FROM subs"
+            )
+            # 只读取目录项统计备份（含 .db 快照和JSON备份），不解析备份内容
+            backups = self.list_backups_meta()
+            backups_size = sum(backup['size'] for backup in backups)
+            
+            return {
+                'users_count': users_count,
+                'subscriptions_count': subscriptions_count,
+                'backups_count': len(backups),
+                'storage_sizes': {
+                    'preferences': preferences_size,
+                    'subscriptions': subscriptions_size,
+                    'backups': backups_size,
+                    'total': preferences_size + subscriptions_size + backups_size
+                },
+                'data_directory': str(self.data_dir),
+                'last_updated': datetime.now().isoformat()
+            }
+            
+        except Exception as e:
+            logger.error(f"获取存储统计失败: {e}")
+            return {}
+    
     def validate_data_integrity(self) -> Dict[str, Any]:
         """验证数据完整性"""
         try:
@@ -366,34 +1082,25 @@ class UserDataStorage:
                 'checked_at': datetime.now().isoformat()
             }
             
-            # 检查用户偏好文件
-            for user_id in self.list_all_users():
-                try:
-                    preferences = self.load_user_preferences(user_id)
-                    if preferences and isinstance(preferences, dict):
-                        results['preferences']['valid'] += 1
-                    else:
-                        results['preferences']['invalid'] += 1
-                        results['preferences']['errors'].append(f"无效的偏好数据: {user_id}")
-                except Exception as e:
-                    results['preferences']['invalid'] += 1
-                    results['preferences']['errors'].append(f"读取失败 {user_id}: {str(e)}")
-            
-            # 检查订阅文件
-            for subscription_id in self.list_all_subscriptions():
-                try:
-                    subscription = self.load_subscription(subscription_id)
-                    if subscription and isinstance(subscription, dict):
-                        results['subscriptions']['valid'] += 1
-                    else:
-                        results['subscriptions']['invalid'] += 1
-                        results['subscriptions']['errors'].append(f"无效的订阅数据: {subscription_id}")
-                except Exception as e:
-                    results['subscriptions']['invalid'] += 1
-                    results['subscriptions']['errors'].append(f"读取失败 {subscription_id}: {str(e)}")
+            checks = (
+                ('preferences', "SELECT id, data FROM prefs", "无效的偏好数据"),
+                ('subscriptions', "SELECT id, data FROM subs", "无效的订阅数据"),
+            )
+            for section, sql, invalid_msg in checks:
+                section_results = results[section]
+                for record_id, raw in self._execute(sql):
+                    try:
+                        if _is_valid_record(raw):
+                            section_results['valid'] += 1
+                        else:
+                            section_results['invalid'] += 1
+                            section_results['errors'].append(f"{invalid_msg}: {record_id}")
+                    except Exception as e:
+                        section_results['invalid'] += 1
+                        section_results['errors'].append(f"读取失败 {record_id}: {str(e)}")
             
             return results
             
         except Exception as e:
             logger.error(f"数据完整性验证失败: {e}")
-            return {'error': str(e)} 
\ No newline at end of file
+            return {'error': str(e)}
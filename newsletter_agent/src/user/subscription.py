@@ -4,9 +4,15 @@ Newsletter Agent - Subscription Management System
 Handles user subscriptions, unsubscriptions, and email scheduling
 """
 
-from typing import Dict, List, Any, Optional
-from dataclasses import dataclass, asdict
+from typing import Dict, List, Any, Optional, Set, TextIO, Tuple
+from dataclasses import dataclass, fields
 from datetime import datetime, timedelta
+from collections import Counter
+from enum import IntEnum
+import functools
+import heapq
+import re
+import sys
 import uuid
 import json
 
@@ -14,9 +20,94 @@ try:
     from loguru import logger
 except ImportError:
     import logging
-    logger = logging.getLogger(__name__)
+    from .logging_utils import BraceStyleAdapter
+    logger = BraceStyleAdapter(logging.getLogger(__name__), {})
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+class Status(IntEnum):
+    """Subscription status"""
+    ACTIVE = 1
+    PAUSED = 2
+    CANCELLED = 3
+    PENDING = 4
+    
+    @classmethod
+    def parse(cls, value: Any) -> 'Status':
+        """Convert a Status, its value or its (case-insensitive) name"""
+        if isinstance(value, str):
+            return cls[value.upper()]
+        return cls(value)
+
+
+def _pop_status(data: Dict[str, Any]) -> Status:
+    """Pop the status from a serialized subscription, accepting the legacy is_active/subscription_status pair"""
+    is_active = data.pop('is_active', True)
+    legacy_status = data.pop('subscription_status', None)
+    if 'status' in data:
+        return Status.parse(data.pop('status'))
+    if legacy_status is not None:
+        status = Status.parse(legacy_status)
+    else:
+        status = Status.ACTIVE
+    if not is_active and status is Status.ACTIVE:
+        status = Status.CANCELLED
+    return status
+
+
+def _dumps(obj: Any, pretty: bool = False) -> str:
+    """Serialize to a JSON string (orjson when installed, which also encodes datetimes natively)"""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if pretty else 0).decode('utf-8')
+    if pretty:
+        return json.dumps(obj, ensure_ascii=False, indent=2)
+    return json.dumps(obj, ensure_ascii=False, separators=(',', ':'))
+
+
+def _loads(data: Any) -> Any:
+    """Parse a JSON string or bytes"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+FREQUENCIES = ('daily', 'weekly', 'bi-weekly', 'monthly')
+_VALID_FREQUENCIES = frozenset(FREQUENCIES)
+
+_DATETIME_FIELDS = ('created_at', 'updated_at', 'last_sent_at', 'next_send_at', 'cancelled_at')
+
+# Low-cardinality string fields, interned so all subscriptions share one object per value
+_INTERNED_FIELDS = frozenset(('frequency', 'preferred_time', 'timezone',
+                              'subscription_source', 'subscription_type'))
 
+_EMAIL_RE = re.compile(r'^[^@]+@[^@]+\.[^@]+$')
+_TIME_RE = re.compile(r'^\d{2}:\d{2}$')
+
+
+@functools.lru_cache(maxsize=1024)
+def _parse_hhmm(value: str) -> Tuple[int, int]:
+    """Parse an HH:MM string, defaulting to 9:00"""
+    try:
+        hour, minute = value.split(':', 1)
+        return int(hour), int(minute)
+    except Exception:
+        return 9, 0
+
+
+def _slotted(cls):
+    """Recreate a dataclass with a __slots__ tuple of its fields (dataclass(slots=True) needs Python 3.10+)"""
+    names = tuple(f.name for f in fields(cls))
+    namespace = {key: value for key, value in cls.__dict__.items()
+                 if key not in names and key not in ('__dict__', '__weakref__')}
+    namespace['__slots__'] = names
+    return type(cls)(cls.__name__, cls.__bases__, namespace)
+
+
+@_slotted
 @dataclass
 class Subscription:
     """Subscription data structure"""
@@ -26,8 +117,7 @@ class Subscription:
     name: str = ""
     
     # Subscription status
-    is_active: bool = True
-    subscription_status: str = "active"  # active, paused, cancelled, pending
+    status: Status = Status.ACTIVE
     
     # Subscription settings
     frequency: str = "daily"  # daily, weekly, bi-weekly, monthly
@@ -51,23 +141,28 @@ class Subscription:
     
     def __post_init__(self):
         if not self.subscription_id:
-            self.subscription_id = str(uuid.uuid4())
-        if self.created_at is None:
-            self.created_at = datetime.now()
-        if self.updated_at is None:
-            self.updated_at = datetime.now()
-        if self.next_send_at is None:
-            self.next_send_at = self._calculate_next_send_time()
-    
-    def _calculate_next_send_time(self) -> datetime:
+            self.subscription_id = uuid.uuid4().hex
+        self.frequency = sys.intern(self.frequency)
+        self.preferred_time = sys.intern(self.preferred_time)
+        self.timezone = sys.intern(self.timezone)
+        self.subscription_source = sys.intern(self.subscription_source)
+        self.subscription_type = sys.intern(self.subscription_type)
+        if self.created_at is None or self.updated_at is None or self.next_send_at is None:
+            now = datetime.now()
+            if self.created_at is None:
+                self.created_at = now
+            if self.updated_at is None:
+                self.updated_at = now
+            if self.next_send_at is None:
+                self.next_send_at = self._calculate_next_send_time(now)
+    
+    def _calculate_next_send_time(self, now: Optional[datetime] = None) -> datetime:
         """Calculate next send time"""
-        now = datetime.now()
+        if now is None:
+            now = datetime.now()
         
         # Parse preferred_time
-        try:
-            hour, minute = map(int, self.preferred_time.split(':'))
-        except:
-            hour, minute = 9, 0  # Default 9:00
+        hour, minute = _parse_hhmm(self.preferred_time)
         
         # Calculate next send time
         if self.frequency == "daily":
@@ -75,16 +170,12 @@ class Subscription:
             if next_send <= now:
                 next_send += timedelta(days=1)
         elif self.frequency == "weekly":
-            # Send every Monday
-            days_ahead = 0 - now.weekday()  # Monday = 0
-            if days_ahead <= 0:
-                days_ahead += 7
+            # Send every Monday (Monday = 0), never today
+            days_ahead = (7 - now.weekday()) % 7 or 7
             next_send = (now + timedelta(days=days_ahead)).replace(hour=hour, minute=minute, second=0, microsecond=0)
         elif self.frequency == "bi-weekly":
             # Send every two weeks
-            days_ahead = 0 - now.weekday()
-            if days_ahead <= 0:
-                days_ahead += 14
+            days_ahead = (14 - now.weekday()) % 14 or 14
             next_send = (now + timedelta(days=days_ahead)).replace(hour=hour, minute=minute, second=0, microsecond=0)
         elif self.frequency == "monthly":
             # Send on 1st of each month
@@ -92,47 +183,87 @@ class Subscription:
                 next_send = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
             else:
                 # 1st of next month
-                if now.month == 12:
-                    next_send = datetime(now.year + 1, 1, 1, hour, minute)
-                else:
-                    next_send = datetime(now.year, now.month + 1, 1, hour, minute)
+                year, month = (now.year + 1, 1) if now.month == 12 else (now.year, now.month + 1)
+                next_send = datetime(year, month, 1, hour, minute)
         else:
             # Default daily
             next_send = now.replace(hour=hour, minute=minute, second=0, microsecond=0) + timedelta(days=1)
         
         return next_send
     
-    def update_next_send_time(self):
+    @property
+    def is_active(self) -> bool:
+        """Whether the subscription is currently receiving sends"""
+        return self.status is Status.ACTIVE
+    
+    @property
+    def subscription_status(self) -> str:
+        """Status name in lowercase (active, paused, cancelled, pending)"""
+        return self.status.name.lower()
+    
+    def update_next_send_time(self, now: Optional[datetime] = None):
         """Update next send time"""
-        self.next_send_at = self._calculate_next_send_time()
-        self.updated_at = datetime.now()
+        if now is None:
+            now = datetime.now()
+        self.next_send_at = self._calculate_next_send_time(now)
+        self.updated_at = now
     
     def mark_as_sent(self):
         """Mark as sent"""
-        self.last_sent_at = datetime.now()
+        now = datetime.now()
+        self.last_sent_at = now
         self.total_sent += 1
-        self.update_next_send_time()
+        self.update_next_send_time(now)
+    
+    def _fields_dict(self) -> Dict[str, Any]:
+        """Field values as a dictionary, with datetimes left as datetime objects"""
+        # All fields are immutable values, so no deep copy is needed
+        data = {name: getattr(self, name) for name in self.__slots__}
+        data['status'] = self.status.name
+        # Derived legacy keys, kept so existing consumers of exports keep working
+        data['is_active'] = self.is_active
+        data['subscription_status'] = self.subscription_status
+        return data
     
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary"""
-        data = asdict(self)
+        data = self._fields_dict()
         # Convert datetime to ISO string
-        datetime_fields = ['created_at', 'updated_at', 'last_sent_at', 'next_send_at', 'cancelled_at']
-        for field in datetime_fields:
-            if data.get(field):
-                data[field] = getattr(self, field).isoformat()
+        for field in _DATETIME_FIELDS:
+            value = data[field]
+            if value is not None:
+                data[field] = value.isoformat()
         return data
     
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> 'Subscription':
         """Create instance from dictionary"""
         # Convert ISO string to datetime
-        datetime_fields = ['created_at', 'updated_at', 'last_sent_at', 'next_send_at', 'cancelled_at']
-        for field in datetime_fields:
-            if data.get(field):
-                data[field] = datetime.fromisoformat(data[field])
+        fromisoformat = datetime.fromisoformat
+        value = data.get('created_at')
+        if value:
+            data['created_at'] = fromisoformat(value)
+        value = data.get('updated_at')
+        if value:
+            data['updated_at'] = fromisoformat(value)
+        value = data.get('last_sent_at')
+        if value:
+            data['last_sent_at'] = fromisoformat(value)
+        value = data.get('next_send_at')
+        if value:
+            data['next_send_at'] = fromisoformat(value)
+        value = data.get('cancelled_at')
+        if value:
+            data['cancelled_at'] = fromisoformat(value)
+        data['status'] = _pop_status(data)
         
         return cls(**data)
+    
+    @classmethod
+    def from_dict_many(cls, items: List[Dict[str, Any]]) -> List['Subscription']:
+        """Create instances from a batch of dictionaries (used for bulk imports)"""
+        from_dict = cls.from_dict
+        return [from_dict(data) for data in items]
 
 
 class SubscriptionManager:
@@ -140,9 +271,69 @@ class SubscriptionManager:
     
     def __init__(self):
         self.subscriptions: Dict[str, Subscription] = {}
-        self.email_subscriptions: Dict[str, str] = {}  # email -> subscription_id mapping
+        # normalized email -> subscription_id mapping (cancelled subscriptions are not indexed)
+        self.email_subscriptions: Dict[str, str] = {}
+        self.user_subscriptions: Dict[str, Set[str]] = {}  # user_id -> subscription_ids
+        # Hot subset: subscriptions that are active and not paused/cancelled
+        self._active_subs: Dict[str, Subscription] = {}
+        # (next_send_at, subscription_id) min-heap; stale entries are dropped lazily
+        self._pending_heap: List[Tuple[datetime, str]] = []
+        # Statistics counters, kept in sync with _active_subs by _track()
+        self._status_counts: Counter = Counter()
+        self._frequency_counts: Counter = Counter()
+        self._source_counts: Counter = Counter()
         logger.info("Subscription manager initialized")
     
+    def _track(self, subscription: Subscription, delta: int):
+        """Add (+1) or remove (-1) a subscription's current state from the counters and active partition"""
+        if delta > 0:
+            if subscription.status is Status.ACTIVE:
+                self._active_subs[subscription.subscription_id] = subscription
+        else:
+            self._active_subs.pop(subscription.subscription_id, None)
+        for counts, key in ((self._status_counts, subscription.status),
+                            (self._frequency_counts, subscription.frequency),
+                            (self._source_counts, subscription.subscription_source)):
+            counts[key] += delta
+            if not counts[key]:
+                del counts[key]
+    
+    @staticmethod
+    def _norm_email(email: str) -> str:
+        """Normalize an email address for use as an index key"""
+        return email.strip().lower()
+    
+    def _index_user(self, subscription: Subscription):
+        """Add the subscription to the user_id index"""
+        self.user_subscriptions.setdefault(subscription.user_id, set()).add(subscription.subscription_id)
+    
+    def _unindex_user(self, subscription: Subscription):
+        """Remove the subscription from the user_id index"""
+        subscription_ids = self.user_subscriptions.get(subscription.user_id)
+        if subscription_ids is not None:
+            subscription_ids.discard(subscription.subscription_id)
+            if not subscription_ids:
+                del self.user_subscriptions[subscription.user_id]
+    
+    def _schedule(self, subscription: Subscription):
+        """Push the subscription's next send time onto the pending heap"""
+        if subscription.next_send_at is None:
+            return
+        heapq.heappush(self._pending_heap, (subscription.next_send_at, subscription.subscription_id))
+        
+        # Rebuild once stale entries dominate the heap
+        if len(self._pending_heap) > 2 * len(self._active_subs) + 64:
+            self._rebuild_pending_heap()
+    
+    def _rebuild_pending_heap(self):
+        """Rebuild the pending heap from the active subscriptions"""
+        self._pending_heap = [
+            (sub.next_send_at, sub.subscription_id)
+            for sub in self._active_subs.values()
+            if sub.next_send_at is not None
+        ]
+        heapq.heapify(self._pending_heap)
+    
     def create_subscription(
         self,
         user_id: str,
@@ -156,11 +347,12 @@ class SubscriptionManager:
         # Check if subscription already exists
         existing_subscription = self.get_subscription_by_email(email)
         if existing_subscription:
-            logger.warning(f"Email already has subscription: {email}")
+            logger.warning("Email already has subscription: {}", email)
             return existing_subscription
         
+        # subscription_id is assigned in __post_init__
         subscription = Subscription(
-            subscription_id=str(uuid.uuid4()),
+            subscription_id="",
             user_id=user_id,
             email=email,
             name=name,
@@ -170,9 +362,12 @@ class SubscriptionManager:
         )
         
         self.subscriptions[subscription.subscription_id] = subscription
-        self.email_subscriptions[email] = subscription.subscription_id
+        self.email_subscriptions[self._norm_email(email)] = subscription.subscription_id
+        self._index_user(subscription)
+        self._track(subscription, 1)
+        self._schedule(subscription)
         
-        logger.info(f"Created subscription: {email} ({subscription.subscription_id})")
+        logger.info("Created subscription: {} ({})", email, subscription.subscription_id)
         return subscription
     
     def get_subscription(self, subscription_id: str) -> Optional[Subscription]:
@@ -181,14 +376,14 @@ class SubscriptionManager:
     
     def get_subscription_by_email(self, email: str) -> Optional[Subscription]:
         """Get subscription by email"""
-        subscription_id = self.email_subscriptions.get(email)
+        subscription_id = self.email_subscriptions.get(self._norm_email(email))
         if subscription_id:
             return self.subscriptions.get(subscription_id)
         return None
     
     def get_user_subscriptions(self, user_id: str) -> List[Subscription]:
         """Get all subscriptions for user"""
-        return [sub for sub in self.subscriptions.values() if sub.user_id == user_id]
+        return [self.subscriptions[sid] for sid in self.user_subscriptions.get(user_id, ())]
     
     def update_subscription(
         self,
@@ -196,23 +391,49 @@ class SubscriptionManager:
         updates: Dict[str, Any]
     ) -> Optional[Subscription]:
         """Update subscription"""
-        subscription = self.get_subscription(subscription_id)
+        subscription = self.subscriptions.get(subscription_id)
         if not subscription:
-            logger.warning(f"Subscription not found: {subscription_id}")
+            logger.warning("Subscription not found: {}", subscription_id)
             return None
         
-        # Update fields
+        # Normalize all values first so invalid input leaves the indexes untouched
+        changes = {}
         for key, value in updates.items():
-            if hasattr(subscription, key):
-                setattr(subscription, key, value)
+            if key == 'subscription_status':
+                key = 'status'
+            elif key == 'is_active':
+                key = 'status'
+                value = Status.ACTIVE if value else Status.CANCELLED
+            if key in Subscription.__slots__:
+                if key == 'status':
+                    value = Status.parse(value)
+                elif key in _INTERNED_FIELDS and isinstance(value, str):
+                    value = sys.intern(value)
+                changes[key] = value
         
-        subscription.updated_at = datetime.now()
+        # Update fields
+        old_email_key = self._norm_email(subscription.email)
+        self._track(subscription, -1)
+        self._unindex_user(subscription)
+        for key, value in changes.items():
+            setattr(subscription, key, value)
+        self._index_user(subscription)
+        self._track(subscription, 1)
+        
+        if self.email_subscriptions.get(old_email_key) == subscription_id:
+            del self.email_subscriptions[old_email_key]
+        if subscription.status is not Status.CANCELLED:
+            self.email_subscriptions[self._norm_email(subscription.email)] = subscription_id
+        
+        now = datetime.now()
+        subscription.updated_at = now
         
         # 如果更新了频率或时间，重新计算下次发送时间
         if 'frequency' in updates or 'preferred_time' in updates:
-            subscription.update_next_send_time()
+            subscription.update_next_send_time(now)
+        self._schedule(subscription)
         
-        logger.info(f"Updated subscription: {subscription_id}")
+        logger.info("Updated subscription: {}", subscription_id)
         return subscription
     
     def cancel_subscription(
@@ -221,18 +442,23 @@ class SubscriptionManager:
         reason: str = ""
     ) -> bool:
         """Cancel subscription"""
-        subscription = self.get_subscription(subscription_id)
+        subscription = self.subscriptions.get(subscription_id)
         if not subscription:
-            logger.warning(f"Subscription not found: {subscription_id}")
+            logger.warning("Subscription not found: {}", subscription_id)
             return False
         
-        subscription.is_active = False
-        subscription.subscription_status = "cancelled"
-        subscription.cancelled_at = datetime.now()
+        self._track(subscription, -1)
+        subscription.status = Status.CANCELLED
+        self._track(subscription, 1)
+        email_key = self._norm_email(subscription.email)
+        if self.email_subscriptions.get(email_key) == subscription_id:
+            del self.email_subscriptions[email_key]
+        now = datetime.now()
+        subscription.cancelled_at = now
         subscription.cancellation_reason = reason
-        subscription.updated_at = datetime.now()
+        subscription.updated_at = now
         
-        logger.info(f"Cancelled subscription: {subscription_id} (Reason: {reason})")
+        logger.info("Cancelled subscription: {} (Reason: {})", subscription_id, reason)
         return True
     
     def cancel_subscription_by_email(self, email: str, reason: str = "") -> bool:
@@ -244,125 +470,192 @@ class SubscriptionManager:
     
     def reactivate_subscription(self, subscription_id: str) -> bool:
         """Reactivate subscription"""
-        subscription = self.get_subscription(subscription_id)
+        subscription = self.subscriptions.get(subscription_id)
         if not subscription:
             return False
         
-        subscription.is_active = True
-        subscription.subscription_status = "active"
+        self._track(subscription, -1)
+        subscription.status = Status.ACTIVE
+        self._track(subscription, 1)
+        # Keep a newer subscription that claimed the address while this one was cancelled
+        self.email_subscriptions.setdefault(self._norm_email(subscription.email), subscription_id)
         subscription.cancelled_at = None
         subscription.cancellation_reason = ""
-        subscription.updated_at = datetime.now()
         subscription.update_next_send_time()
+        self._schedule(subscription)
         
-        logger.info(f"Reactivated subscription: {subscription_id}")
+        logger.info("Reactivated subscription: {}", subscription_id)
         return True
     
     def pause_subscription(self, subscription_id: str) -> bool:
         """Pause subscription"""
-        subscription = self.get_subscription(subscription_id)
+        subscription = self.subscriptions.get(subscription_id)
         if not subscription:
             return False
         
-        subscription.subscription_status = "paused"
+        self._track(subscription, -1)
+        subscription.status = Status.PAUSED
+        self._track(subscription, 1)
         subscription.updated_at = datetime.now()
         
-        logger.info(f"Paused subscription: {subscription_id}")
+        logger.info("Paused subscription: {}", subscription_id)
         return True
     
     def resume_subscription(self, subscription_id: str) -> bool:
         """Resume subscription"""
-        subscription = self.get_subscription(subscription_id)
+        subscription = self.subscriptions.get(subscription_id)
         if not subscription:
             return False
         
-        subscription.subscription_status = "active"
-        subscription.updated_at = datetime.now()
+        self._track(subscription, -1)
+        subscription.status = Status.ACTIVE
+        self._track(subscription, 1)
         subscription.update_next_send_time()
+        self._schedule(subscription)
         
-        logger.info(f"Resumed subscription: {subscription_id}")
+        logger.info("Resumed subscription: {}", subscription_id)
         return True
     
     def get_pending_subscriptions(self, limit_time: Optional[datetime] = None) -> List[Subscription]:
-        """Get pending subscriptions"""
+        """Get pending subscriptions
+        
+        Only heap entries due by ``limit_time`` are visited. Entries whose
+        subscription is gone, inactive or rescheduled are dropped; valid ones
+        are pushed back since they stay due until marked as sent.
+        """
         if limit_time is None:
             limit_time = datetime.now()
         
+        heap = self._pending_heap
         pending = []
-        for subscription in self.subscriptions.values():
-            if (subscription.is_active and 
-                subscription.subscription_status == "active" and
-                subscription.next_send_at and
-                subscription.next_send_at <= limit_time):
-                pending.append(subscription)
+        due_entries = []
+        seen = set()
+        while heap and heap[0][0] <= limit_time:
+            entry = heapq.heappop(heap)
+            send_at, subscription_id = entry
+            subscription = self._active_subs.get(subscription_id)
+            if (subscription_id in seen or
+                subscription is None or
+                subscription.next_send_at != send_at):
+                continue
+            seen.add(subscription_id)
+            pending.append(subscription)
+            due_entries.append(entry)
+        
+        for entry in due_entries:
+            heapq.heappush(heap, entry)
         
         return pending
     
+    def pending_count(self, limit_time: Optional[datetime] = None) -> int:
+        """Count pending subscriptions without modifying the heap
+        
+        Walks the heap from the root and only descends into due entries,
+        since every child of a not-yet-due entry is not due either.
+        """
+        if limit_time is None:
+            limit_time = datetime.now()
+        
+        heap = self._pending_heap
+        active_subs = self._active_subs
+        size = len(heap)
+        counted = set()
+        stack = [0] if heap else []
+        while stack:
+            i = stack.pop()
+            send_at, subscription_id = heap[i]
+            if send_at > limit_time:
+                continue
+            subscription = active_subs.get(subscription_id)
+            if subscription is not None and subscription.next_send_at == send_at:
+                counted.add(subscription_id)
+            child = 2 * i + 1
+            if child < size:
+                stack.append(child)
+            if child + 1 < size:
+                stack.append(child + 1)
+        return len(counted)
+    
     def mark_subscription_as_sent(self, subscription_id: str) -> bool:
         """Mark subscription as sent"""
-        subscription = self.get_subscription(subscription_id)
+        subscription = self.subscriptions.get(subscription_id)
         if not subscription:
             return False
         
         subscription.mark_as_sent()
-        logger.info(f"Marked subscription as sent: {subscription_id}")
+        self._schedule(subscription)
+        logger.info("Marked subscription as sent: {}", subscription_id)
         return True
     
     def get_subscription_statistics(self) -> Dict[str, Any]:
         """Get subscription statistics"""
-        total = len(self.subscriptions)
-        active = len([s for s in self.subscriptions.values() if s.is_active])
-        cancelled = len([s for s in self.subscriptions.values() if s.subscription_status == "cancelled"])
-        paused = len([s for s in self.subscriptions.values() if s.subscription_status == "paused"])
-        
-        # Statistics by frequency
-        frequency_stats = {}
-        for subscription in self.subscriptions.values():
-            freq = subscription.frequency
-            frequency_stats[freq] = frequency_stats.get(freq, 0) + 1
-        
-        # Statistics by source
-        source_stats = {}
-        for subscription in self.subscriptions.values():
-            source = subscription.subscription_source
-            source_stats[source] = source_stats.get(source, 0) + 1
-        
         return {
-            'total_subscriptions': total,
-            'active_subscriptions': active,
-            'cancelled_subscriptions': cancelled,
-            'paused_subscriptions': paused,
-            'frequency_distribution': frequency_stats,
-            'source_distribution': source_stats,
-            'pending_count': len(self.get_pending_subscriptions())
+            'total_subscriptions': len(self.subscriptions),
+            'active_subscriptions': self._status_counts[Status.ACTIVE],
+            'cancelled_subscriptions': self._status_counts[Status.CANCELLED],
+            'paused_subscriptions': self._status_counts[Status.PAUSED],
+            'frequency_distribution': dict(self._frequency_counts),
+            'source_distribution': dict(self._source_counts),
+            'pending_count': self.pending_count()
         }
     
-    def export_subscriptions(self) -> str:
-        """Export all subscription data"""
-        data = {
-            'subscriptions': [sub.to_dict() for sub in self.subscriptions.values()],
-            'exported_at': datetime.now().isoformat(),
-            'total_count': len(self.subscriptions)
-        }
-        return json.dumps(data, ensure_ascii=False, indent=2)
+    def export_subscriptions(self, pretty: bool = False, stream: Optional[TextIO] = None) -> Optional[str]:
+        """Export all subscription data
+        
+        Returns the JSON string, or writes it to ``stream`` one subscription
+        at a time (returning None) so large exports are not built in memory.
+        """
+        # orjson writes datetimes as ISO strings itself, so skip the to_dict conversion pass
+        to_record = Subscription._fields_dict if orjson is not None else Subscription.to_dict
+        exported_at = datetime.now().isoformat()
+        
+        if stream is None:
+            data = {
+                'subscriptions': [to_record(sub) for sub in self.subscriptions.values()],
+                'exported_at': exported_at,
+                'total_count': len(self.subscriptions)
+            }
+            return _dumps(data, pretty)
+        
+        stream.write('{"subscriptions":[')
+        for i, sub in enumerate(self.subscriptions.values()):
+            if i:
+                stream.write(',')
+            stream.write(_dumps(to_record(sub), pretty))
+        stream.write(f'],"exported_at":{_dumps(exported_at)},"total_count":{len(self.subscriptions)}}}')
+        return None
     
     def import_subscriptions(self, data_json: str) -> int:
         """Import subscription data"""
         try:
-            data = json.loads(data_json)
+            data = _loads(data_json)
+            # Decode the whole batch first so a bad record leaves the manager untouched
+            subscriptions = Subscription.from_dict_many(data.get('subscriptions', []))
             imported_count = 0
             
-            for sub_data in data.get('subscriptions', []):
-                subscription = Subscription.from_dict(sub_data)
+            for subscription in subscriptions:
+                replaced = self.subscriptions.get(subscription.subscription_id)
+                if replaced is not None:
+                    self._track(replaced, -1)
+                    self._unindex_user(replaced)
+                    email_key = self._norm_email(replaced.email)
+                    if self.email_subscriptions.get(email_key) == subscription.subscription_id:
+                        del self.email_subscriptions[email_key]
                 self.subscriptions[subscription.subscription_id] = subscription
-                self.email_subscriptions[subscription.email] = subscription.subscription_id
+                self._index_user(subscription)
+                self._track(subscription, 1)
+                if subscription.status is not Status.CANCELLED:
+                    self.email_subscriptions[self._norm_email(subscription.email)] = subscription.subscription_id
                 imported_count += 1
             
-            logger.info(f"Imported subscription data: {imported_count} subscriptions")
+            if imported_count:
+                self._rebuild_pending_heap()
+            
+            logger.info("Imported subscription data: {} subscriptions", imported_count)
             return imported_count
             
         except Exception as e:
-            logger.error(f"Failed to import subscription data: {e}")
+            logger.error("Failed to import subscription data: {}", e)
             return 0
     
     def validate_subscription_data(self, subscription_data: Dict[str, Any]) -> Dict[str, Any]:
@@ -376,20 +669,18 @@ class SubscriptionManager:
                 errors[field] = f"{field} is required"
         
         # Validate email format
-        import re
         email = subscription_data.get('email', '')
-        if email and not re.match(r'^[^@]+@[^@]+\.[^@]+$', email):
+        if email and not _EMAIL_RE.match(email):
             errors['email'] = "Invalid email format"
         
         # Validate frequency
-        valid_frequencies = ['daily', 'weekly', 'bi-weekly', 'monthly']
         frequency = subscription_data.get('frequency', 'daily')
-        if frequency not in valid_frequencies:
-            errors['frequency'] = f"Frequency must be one of: {', '.join(valid_frequencies)}"
+        if frequency not in _VALID_FREQUENCIES:
+            errors['frequency'] = f"Frequency must be one of: {', '.join(FREQUENCIES)}"
         
         # Validate time format
         preferred_time = subscription_data.get('preferred_time', '09:00')
-        if not re.match(r'^\d{2}:\d{2}$', preferred_time):
+        if not _TIME_RE.match(preferred_time):
             errors['preferred_time'] = "Time format must be HH:MM"
         
         return errors
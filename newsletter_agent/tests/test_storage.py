@@ -0,0 +1,245 @@
+# -*- coding: utf-8 -*-
+"""
+User data storage tests
+"""
+
+import pytest
+
+from newsletter_agent.src.user.storage import UserDataStorage
+
+
+@pytest.fixture
+def storage(tmp_path):
+    return UserDataStorage(data_dir=str(tmp_path))
+
+
+def test_preferences_roundtrip(storage):
+    """Test saving and loading user preferences"""
+    data = {"user_id": "u1", "email": "a@example.com", "name": "张三"}
+    assert storage.save_user_preferences("u1", data)
+    assert "saved_at" not in data
+
+    loaded = storage.load_user_preferences("u1")
+    assert loaded["email"] == "a@example.com"
+    assert loaded["name"] == "张三"
+    assert "saved_at" in loaded
+    assert storage.load_user_preferences("missing") is None
+
+
+def test_compact_encoding(storage):
+    """Test files are written atomically as compact UTF-8 JSON"""
+    storage.save_subscription("s1", {"email": "a@example.com", "name": "张三"})
+
+    assert [p.name for p in storage.subscriptions_dir.iterdir()] == ["s1.json"]
+    raw = (storage.subscriptions_dir / "s1.json").read_bytes()
+    assert b"\n" not in raw
+    assert "张三".encode("utf-8") in raw
+
+
+def test_delete(storage):
+    """Test deleting stored records"""
+    storage.save_subscription("s1", {"email": "a@example.com"})
+
+    assert storage.delete_subscription("s1")
+    assert not storage.delete_subscription("s1")
+    assert storage.list_all_subscriptions() == []
+
+
+def test_large_file_load(storage):
+    """Test loading files above the mmap threshold"""
+    keywords = [f"关键词{i}" for i in range(20000)]
+    storage.save_user_preferences("u1", {"user_id": "u1", "keywords": keywords})
+
+    assert (storage.preferences_dir / "u1.json").stat().st_size > 64 * 1024
+    assert storage.load_user_preferences("u1")["keywords"] == keywords
+
+
+def test_backup_and_restore(storage):
+    """Test backing up and restoring all records"""
+    storage.save_user_preferences("u1", {"user_id": "u1", "email": "a@example.com"})
+    storage.save_subscription("s1", {"user_id": "u1", "email": "a@example.com"})
+    assert storage.create_backup("b1")
+
+    storage.delete_user_preferences("u1")
+    storage.delete_subscription("s1")
+    assert storage.restore_backup("b1")
+
+    assert storage.load_user_preferences("u1")["email"] == "a@example.com"
+    assert storage.load_subscription("s1")["user_id"] == "u1"
+
+    backups = storage.list_backups()
+    assert [b["name"] for b in backups] == ["b1"]
+    assert backups[0]["preferences_count"] == 1
+    assert backups[0]["subscriptions_count"] == 1
+
+
+def test_backup_skips_invalid_files(storage):
+    """Test corrupt record files are left out of backups"""
+    storage.save_user_preferences("u1", {"user_id": "u1"})
+    (storage.preferences_dir / "broken.json").write_text("{not json", encoding="utf-8")
+    assert storage.create_backup("b1")
+
+    backups = storage.list_backups()
+    assert backups[0]["preferences_count"] == 1
+
+
+def test_load_cache_invalidation(storage):
+    """Test cached loads pick up saves and external edits"""
+    storage.save_user_preferences("u1", {"user_id": "u1", "name": "a"})
+    storage.load_user_preferences("u1")["name"] = "mutated"
+    assert storage.load_user_preferences("u1")["name"] == "a"
+
+    storage.save_user_preferences("u1", {"user_id": "u1", "name": "a", "topics": ["tech"]})
+    storage.load_user_preferences("u1")["topics"].append("mutated")
+    assert storage.load_user_preferences("u1")["topics"] == ["tech"]
+
+    storage.save_user_preferences("u1", {"user_id": "u1", "name": "b"})
+    assert storage.load_user_preferences("u1")["name"] == "b"
+
+    (storage.preferences_dir / "u1.json").write_text('{"user_id":"u1","name":"edited"}', encoding="utf-8")
+    assert storage.load_user_preferences("u1")["name"] == "edited"
+
+
+def test_find_subscriptions_by_email(storage, tmp_path):
+    """Test the email index follows saves and deletes"""
+    storage.save_subscription("s1", {"email": "a@example.com"})
+    storage.save_subscription("s2", {"email": "a@example.com"})
+    storage.save_subscription("s3", {"email": "b@example.com"})
+    assert sorted(storage.find_subscriptions_by_email("a@example.com")) == ["s1", "s2"]
+
+    storage.save_subscription("s2", {"email": "b@example.com"})
+    storage.delete_subscription("s1")
+    assert storage.find_subscriptions_by_email("a@example.com") == []
+
+    reopened = UserDataStorage(data_dir=str(tmp_path))
+    assert sorted(reopened.find_subscriptions_by_email("b@example.com")) == ["s2", "s3"]
+    assert not (tmp_path / "email_index.json").exists()
+
+
+def test_email_index_shared_directory(storage, tmp_path):
+    """Test two storages on one directory see each other's subscriptions"""
+    other = UserDataStorage(data_dir=str(tmp_path))
+    storage.save_subscription("s1", {"email": "a@example.com"})
+    assert storage.find_subscriptions_by_email("a@example.com") == ["s1"]
+    assert other.find_subscriptions_by_email("a@example.com") == ["s1"]
+
+    other.save_subscription("s2", {"email": "a@example.com"})
+    storage.save_subscription("s3", {"email": "a@example.com"})
+    other.delete_subscription("s1")
+    assert sorted(storage.find_subscriptions_by_email("a@example.com")) == ["s2", "s3"]
+    assert sorted(other.find_subscriptions_by_email("a@example.com")) == ["s2", "s3"]
+
+
+def test_bulk_create(storage):
+    """Test saving a user's preferences and subscription together"""
+    assert storage.bulk_create("u1", {"user_id": "u1"}, "s1", {"user_id": "u1", "email": "a@example.com"})
+
+    prefs = storage.load_user_preferences("u1")
+    sub = storage.load_subscription("s1")
+    assert prefs["saved_at"] == sub["saved_at"]
+    assert storage.find_subscriptions_by_email("a@example.com") == ["s1"]
+
+    # 订阅写入失败时不保留偏好
+    assert not storage.bulk_create("u2", {"user_id": "u2"}, "s2", {"bad": object()})
+    assert storage.load_user_preferences("u2") is None
+
+    # 已有用户的偏好在订阅写入失败时保持不变
+    assert not storage.bulk_create("u1", {"user_id": "u1", "name": "new"}, "s3", {"bad": object()})
+    assert storage.load_user_preferences("u1") == prefs
+
+
+def test_sqlite_storage(tmp_path):
+    """Test the SQLite backend CRUD, lookup and backup paths"""
+    from newsletter_agent.src.user.storage import SQLiteUserDataStorage
+
+    storage = SQLiteUserDataStorage(data_dir=str(tmp_path))
+    try:
+        assert storage.save_user_preferences("u1", {"user_id": "u1", "name": "张三"})
+        assert storage.save_subscription("s1", {"user_id": "u1", "email": "a@example.com"})
+        assert storage.load_user_preferences("u1")["name"] == "张三"
+        assert storage.find_subscriptions_by_email("a@example.com") == ["s1"]
+        storage.rebuild_email_index()
+        assert storage.find_subscriptions_by_email("a@example.com") == ["s1"]
+        assert storage.list_all_users() == ["u1"]
+
+        assert storage.bulk_create("u2", {"user_id": "u2"}, "s2", {"user_id": "u2", "email": "b@example.com"})
+        assert storage.find_subscriptions_by_email("b@example.com") == ["s2"]
+        assert not storage.bulk_create("u3", {"user_id": "u3"}, "s3", {"bad": object()})
+        assert sorted(storage.list_all_users()) == ["u1", "u2"]
+        assert storage.delete_user_preferences("u2") and storage.delete_subscription("s2")
+
+        assert storage.create_backup("b1")
+        assert storage.delete_subscription("s1")
+        assert not storage.delete_subscription("s1")
+        assert storage.restore_backup("b1")
+        assert storage.load_subscription("s1")["email"] == "a@example.com"
+
+        backups = storage.list_backups()
+        assert backups[0]["name"] == "b1"
+        assert backups[0]["subscriptions_count"] == 1
+        stats = storage.get_storage_statistics()
+        assert stats["users_count"] == 1
+        assert stats["backups_count"] == 1
+        assert stats["storage_sizes"]["backups"] == (storage.backups_dir / "b1.db").stat().st_size
+        assert storage.validate_data_integrity()["subscriptions"]["valid"] == 1
+    finally:
+        storage.close()
+
+
+def test_storage_statistics(storage):
+    """Test counts and sizes reported by get_storage_statistics"""
+    storage.save_user_preferences("u1", {"user_id": "u1"})
+    storage.save_subscription("s1", {"email": "a@example.com"})
+    storage.create_backup("b1")
+
+    stats = storage.get_storage_statistics()
+    assert stats["users_count"] == 1
+    assert stats["subscriptions_count"] == 1
+    assert stats["backups_count"] == 1
+    sizes = stats["storage_sizes"]
+    assert sizes["preferences"] == (storage.preferences_dir / "u1.json").stat().st_size
+    assert sizes["total"] == sizes["preferences"] + sizes["subscriptions"] + sizes["backups"]
+
+
+def test_validate_data_integrity(storage):
+    """Test valid and invalid records are counted"""
+    storage.save_user_preferences("u1", {"user_id": "u1"})
+    storage.save_subscription("s1", {"email": "a@example.com"})
+    (storage.subscriptions_dir / "broken.json").write_text("[]", encoding="utf-8")
+
+    results = storage.validate_data_integrity()
+    assert results["preferences"] == {"valid": 1, "invalid": 0, "errors": []}
+    assert results["subscriptions"]["valid"] == 1
+    assert results["subscriptions"]["invalid"] == 1
+
+
+def test_cleanup_old_backups(storage):
+    """Test only the newest backups are kept"""
+    import os
+
+    for i in range(3):
+        storage.create_backup(f"b{i}")
+        os.utime(storage.backups_dir / f"b{i}.json", (1000 + i, 1000 + i))
+
+    assert [b["name"] for b in storage.list_backups_meta()] == ["b2", "b1", "b0"]
+    assert storage.cleanup_old_backups(keep_count=1) == 2
+    assert [b["name"] for b in storage.list_backups_meta()] == ["b2"]
+
+
+def test_compressed_backup(storage):
+    """Test compressed backups are listed and restored like plain ones"""
+    storage.save_subscription("s1", {"email": "a@example.com"})
+    assert storage.create_backup("b1", compress=True)
+
+    backup_files = [p.name for p in storage.backups_dir.iterdir()]
+    assert backup_files in (["b1.json.gz"], ["b1.json.zst"])
+
+    storage.delete_subscription("s1")
+    assert storage.restore_backup("b1")
+    assert storage.load_subscription("s1")["email"] == "a@example.com"
+
+    backups = storage.list_backups()
+    assert [b["name"] for b in backups] == ["b1"]
+    assert backups[0]["subscriptions_count"] == 1
+    assert [b["name"] for b in storage.list_backups_meta()] == ["b1"]
+    assert storage.get_storage_statistics()["backups_count"] == 1
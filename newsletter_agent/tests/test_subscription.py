@@ -0,0 +1,227 @@
+# -*- coding: utf-8 -*-
+"""
+Subscription management tests
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from newsletter_agent.src.user.subscription import SubscriptionManager
+
+
+@pytest.fixture
+def manager():
+    return SubscriptionManager()
+
+
+def test_pending_subscriptions(manager):
+    """Test only due, active subscriptions are reported as pending"""
+    a = manager.create_subscription("u1", "a@example.com")
+    b = manager.create_subscription("u2", "b@example.com", frequency="monthly")
+    later = max(a.next_send_at, b.next_send_at) + timedelta(minutes=1)
+
+    assert manager.get_pending_subscriptions(datetime.now() - timedelta(days=1)) == []
+    assert {s.email for s in manager.get_pending_subscriptions(later)} == {"a@example.com", "b@example.com"}
+    # Querying again returns the same entries until they are sent
+    assert len(manager.get_pending_subscriptions(later)) == 2
+
+    manager.pause_subscription(a.subscription_id)
+    manager.cancel_subscription(b.subscription_id)
+    assert manager.get_pending_subscriptions(later) == []
+
+    manager.resume_subscription(a.subscription_id)
+    assert manager.get_pending_subscriptions(later) == [a]
+    assert manager.pending_count(later) == 1
+
+
+def test_mark_as_sent_reschedules(manager):
+    """Test sent subscriptions move to their next send time"""
+    sub = manager.create_subscription("u1", "a@example.com")
+    due_at = sub.next_send_at
+
+    assert manager.mark_subscription_as_sent(sub.subscription_id)
+    assert sub.total_sent == 1
+    assert sub.next_send_at >= due_at
+    assert manager.get_pending_subscriptions(sub.next_send_at - timedelta(seconds=1)) == []
+    assert manager.get_pending_subscriptions(sub.next_send_at) == [sub]
+
+
+def test_subscription_statistics(manager):
+    """Test statistics counters follow state transitions, updates and imports"""
+    a = manager.create_subscription("u1", "a@example.com")
+    b = manager.create_subscription("u2", "b@example.com", frequency="weekly", subscription_source="api")
+    manager.pause_subscription(a.subscription_id)
+    manager.cancel_subscription(b.subscription_id)
+    manager.update_subscription(a.subscription_id, {"frequency": "monthly"})
+
+    stats = manager.get_subscription_statistics()
+    assert stats["total_subscriptions"] == 2
+    assert stats["active_subscriptions"] == 0
+    assert stats["paused_subscriptions"] == 1
+    assert stats["cancelled_subscriptions"] == 1
+    assert stats["frequency_distribution"] == {"monthly": 1, "weekly": 1}
+    assert stats["source_distribution"] == {"web": 1, "api": 1}
+
+    other = SubscriptionManager()
+    assert other.import_subscriptions(manager.export_subscriptions()) == 2
+    assert other.import_subscriptions(manager.export_subscriptions()) == 2
+    assert other.get_subscription_statistics()["frequency_distribution"] == {"monthly": 1, "weekly": 1}
+    assert other.get_subscription_statistics()["paused_subscriptions"] == 1
+
+
+def test_get_user_subscriptions(manager):
+    """Test the user_id index follows creates and user_id updates"""
+    a = manager.create_subscription("u1", "a@example.com")
+    b = manager.create_subscription("u1", "b@example.com")
+    manager.create_subscription("u2", "c@example.com")
+
+    assert {s.email for s in manager.get_user_subscriptions("u1")} == {"a@example.com", "b@example.com"}
+    assert manager.get_user_subscriptions("missing") == []
+
+    manager.update_subscription(b.subscription_id, {"user_id": "u2"})
+    assert manager.get_user_subscriptions("u1") == [a]
+    assert len(manager.get_user_subscriptions("u2")) == 2
+
+
+def test_validate_subscription_data(manager):
+    """Test field validation errors"""
+    assert manager.validate_subscription_data({"user_id": "u1", "email": "a@example.com"}) == {}
+
+    errors = manager.validate_subscription_data(
+        {"email": "not-an-email", "frequency": "hourly", "preferred_time": "9am"}
+    )
+    assert set(errors) == {"user_id", "email", "frequency", "preferred_time"}
+
+
+def test_to_dict_roundtrip(manager):
+    """Test to_dict serializes datetimes and from_dict restores them"""
+    from newsletter_agent.src.user.subscription import Subscription
+
+    sub = manager.create_subscription("u1", "a@example.com", name="张三")
+    data = sub.to_dict()
+    assert data["created_at"] == sub.created_at.isoformat()
+    assert data["last_sent_at"] is None
+
+    restored = Subscription.from_dict(data)
+    assert restored == sub
+
+
+def test_export_to_stream(manager):
+    """Test streamed and returned exports decode to the same data"""
+    import io
+    import json
+
+    manager.create_subscription("u1", "a@example.com", name="张三")
+    manager.create_subscription("u2", "b@example.com")
+
+    buf = io.StringIO()
+    assert manager.export_subscriptions(stream=buf) is None
+    streamed = json.loads(buf.getvalue())
+    returned = json.loads(manager.export_subscriptions(pretty=True))
+
+    assert streamed["total_count"] == returned["total_count"] == 2
+    assert streamed["subscriptions"] == returned["subscriptions"]
+
+    other = SubscriptionManager()
+    assert other.import_subscriptions(buf.getvalue()) == 2
+
+
+def test_import_rejects_bad_batch(manager):
+    """Test a batch with an invalid record imports nothing"""
+    import json
+
+    manager.create_subscription("u1", "a@example.com")
+    data = json.loads(manager.export_subscriptions())
+    data["subscriptions"].append({"user_id": "u2"})
+
+    other = SubscriptionManager()
+    assert other.import_subscriptions(json.dumps(data)) == 0
+    assert other.subscriptions == {}
+
+
+def test_status_from_legacy_dict():
+    """Test records with is_active/subscription_status load into a single status"""
+    from newsletter_agent.src.user.subscription import Status, Subscription
+
+    base = {"subscription_id": "s1", "user_id": "u1", "email": "a@example.com"}
+    paused = Subscription.from_dict({**base, "is_active": True, "subscription_status": "paused"})
+    cancelled = Subscription.from_dict({**base, "is_active": False, "subscription_status": "active"})
+
+    assert paused.status is Status.PAUSED and not paused.is_active
+    assert cancelled.subscription_status == "cancelled"
+    assert Subscription.from_dict(paused.to_dict()).status is Status.PAUSED
+
+    data = paused.to_dict()
+    assert data["is_active"] is False and data["subscription_status"] == "paused"
+
+
+def test_update_is_active(manager):
+    """Test updating the legacy is_active flag changes the status"""
+    from newsletter_agent.src.user.subscription import Status
+
+    sub = manager.create_subscription("u1", "a@example.com")
+    manager.update_subscription(sub.subscription_id, {"is_active": False})
+    assert sub.status is Status.CANCELLED
+    assert manager.get_subscription_by_email("a@example.com") is None
+    assert manager.get_subscription_statistics()["active_subscriptions"] == 0
+
+    manager.update_subscription(sub.subscription_id, {"is_active": True})
+    assert sub.status is Status.ACTIVE
+    assert manager.get_subscription_by_email("a@example.com") is sub
+
+
+def test_update_invalid_status(manager):
+    """Test an invalid status update leaves the subscription and its indexes unchanged"""
+    from newsletter_agent.src.user.subscription import Status
+
+    sub = manager.create_subscription("u1", "a@example.com")
+    with pytest.raises(KeyError):
+        manager.update_subscription(sub.subscription_id, {"frequency": "weekly", "status": "bogus"})
+
+    assert sub.status is Status.ACTIVE and sub.frequency == "daily"
+    assert manager.get_user_subscriptions("u1") == [sub]
+    assert manager.get_subscription_statistics()["active_subscriptions"] == 1
+    assert manager.get_pending_subscriptions(sub.next_send_at) == [sub]
+
+
+def test_email_lookup_is_normalized(manager):
+    """Test email lookups ignore case and surrounding whitespace"""
+    sub = manager.create_subscription("u1", "Alice@Example.com")
+
+    assert manager.create_subscription("u1", " alice@example.COM ") is sub
+    assert manager.get_subscription_by_email("alice@example.com") is sub
+
+    manager.update_subscription(sub.subscription_id, {"email": "bob@example.com"})
+    assert manager.get_subscription_by_email("Bob@Example.com") is sub
+    assert manager.get_subscription_by_email("alice@example.com") is None
+    assert manager.cancel_subscription_by_email("BOB@EXAMPLE.COM")
+
+
+def test_cancel_and_reactivate_email_index(manager):
+    """Test cancelled subscriptions leave the email index until reactivated"""
+    sub = manager.create_subscription("u1", "a@example.com")
+    manager.cancel_subscription(sub.subscription_id)
+    assert manager.get_subscription_by_email("a@example.com") is None
+
+    manager.reactivate_subscription(sub.subscription_id)
+    assert manager.get_subscription_by_email("a@example.com") is sub
+
+
+def test_import_replaces_email_index(manager):
+    """Test imported records replacing existing ones drop the old email entry"""
+    import json
+
+    a = manager.create_subscription("u1", "a@example.com")
+    b = manager.create_subscription("u2", "b@example.com")
+    data = json.loads(manager.export_subscriptions())
+    for record in data["subscriptions"]:
+        if record["subscription_id"] == a.subscription_id:
+            record["email"] = "new@example.com"
+        else:
+            record["status"] = "CANCELLED"
+
+    assert manager.import_subscriptions(json.dumps(data)) == 2
+    assert manager.get_subscription_by_email("a@example.com") is None
+    assert manager.get_subscription_by_email("new@example.com").subscription_id == a.subscription_id
+    assert manager.get_subscription_by_email("b@example.com") is None
@@ -0,0 +1,46 @@
+# -*- coding: utf-8 -*-
+"""
+Newsletter template engine tests
+"""
+
+import pytest
+
+from newsletter_agent.src.templates.newsletter_templates import NewsletterTemplateEngine
+
+
+@pytest.fixture
+def engine():
+    return NewsletterTemplateEngine()
+
+
+@pytest.fixture
+def data(engine):
+    sections = [
+        {"title": "科技", "priority": 2, "summary": "本周要闻", "articles": [
+            {"title": f"文章{i}", "url": "https://example.com", "content": "内容" * 200, "source": "RSS"}
+            for i in range(5)
+        ]},
+        {"title": "商业", "priority": 1, "articles": [{"title": "财报", "summary": "摘要"}]},
+    ]
+    return engine.create_newsletter_data("每周简报", "科技与商业", sections)
+
+
+@pytest.mark.parametrize("output_format,style", [
+    ("html", "professional"), ("html", "casual"), ("markdown", "standard"), ("markdown", "detailed"),
+])
+def test_iter_newsletter_matches_generate(engine, data, output_format, style):
+    """Test streamed chunks join to the same document generate_newsletter returns"""
+    chunks = list(engine.iter_newsletter(data, style, output_format))
+    document = engine.generate_newsletter(data, style, output_format)
+
+    assert len(chunks) > 2
+    assert "".join(chunks) == document
+    assert "每周简报" in document
+    assert document.index("财报") < document.index("文章0")
+
+
+def test_unsupported_format(engine, data):
+    """Test unsupported formats raise when streaming and fall back to an error document"""
+    with pytest.raises(ValueError):
+        engine.iter_newsletter(data, output_format="pdf")
+    assert "简报生成失败" in engine.generate_newsletter(data, output_format="pdf")
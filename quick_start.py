@@ -5,13 +5,37 @@ Newsletter Agent - Quick Start Script
 Helps users quickly configure and start the system
 """
 
+import functools
+import importlib.util
+import json
 import os
 import sys
 from pathlib import Path
 
-def create_env_file():
-    """Create environment config file"""
-    env_content = """# Newsletter Agent Environment Config File
+# Snapshot of os.environ; call refresh_env_cache() after changing the environment
+_ENV = dict(os.environ)
+
+def refresh_env_cache():
+    """Re-read os.environ into the snapshot"""
+    global _ENV
+    _ENV = dict(os.environ)
+
+@functools.lru_cache(maxsize=1)
+def _load_env(env_mtime):
+    """Load .env into os.environ; keyed on its mtime so edits trigger a re-parse"""
+    from dotenv import load_dotenv
+    load_dotenv(".env")
+    refresh_env_cache()
+
+def load_env():
+    """Load .env unless it is unchanged since the last load"""
+    try:
+        env_mtime = Path(".env").stat().st_mtime_ns
+    except OSError:
+        env_mtime = None
+    _load_env(env_mtime)
+
+ENV_TEMPLATE = """# Newsletter Agent Environment Config File
 # Simplified version - core features only
 
 # Required settings - minimum requirements for system operation
@@ -45,20 +69,33 @@ DEFAULT_TOPICS=technology,business,health
 # 2. Replace your_openai_api_key_here with your real OpenAI API key
 # 3. Reddit API is optional, can be left unconfigured if not used
 """
-    
-    env_file = Path(".env")
-    if not env_file.exists():
-        with open(env_file, "w", encoding="utf-8") as f:
-            f.write(env_content)
-        print("✅ Created .env config file")
-        return True
-    else:
+
+def create_env_file():
+    """Create environment config file"""
+    try:
+        # Exclusive create: fails if the file exists, no separate exists() check
+        with open(".env", "x", encoding="utf-8") as f:
+            f.write(ENV_TEMPLATE)
+    except FileExistsError:
         print("ℹ️  .env file already exists, skipping creation")
         return False
+    print("✅ Created .env config file")
+    return True
+
+# Packages whose import name differs from the distribution name
+_IMPORT_NAMES = {"python-dotenv": "dotenv"}
+
+def _probe_package(package):
+    """Return whether a package is installed (finder lookup only, module code is not executed)"""
+    module_name = _IMPORT_NAMES.get(package, package.replace("-", "_"))
+    try:
+        return importlib.util.find_spec(module_name) is not None
+    except (ImportError, ValueError):
+        return False
 
 def check_dependencies():
     """Check dependencies"""
-    print("🔍 Checking dependencies...")
+    lines = ["🔍 Checking dependencies..."]
     
     required_packages = [
         "gradio", "langchain", "langchain-openai", "loguru", 
@@ -68,44 +105,101 @@ def check_dependencies():
     missing_packages = []
     
     for package in required_packages:
-        try:
-            __import__(package.replace("-", "_"))
-            print(f"  ✅ {package}")
-        except ImportError:
+        if _probe_package(package):
+            lines.append(f"  ✅ {package}")
+        else:
             missing_packages.append(package)
-            print(f"  ❌ {package}")
+            lines.append(f"  ❌ {package}")
     
     if missing_packages:
-        print(f"\n⚠️  Missing dependencies: {', '.join(missing_packages)}")
-        print("Please run the following command to install:")
-        print(f"pip install {' '.join(missing_packages)}")
-        return False
+        lines += [
+            f"\n⚠️  Missing dependencies: {', '.join(missing_packages)}",
+            "Please run the following command to install:",
+            f"pip install {' '.join(missing_packages)}",
+        ]
     else:
-        print("✅ All dependencies are installed")
-        return True
+        lines.append("✅ All dependencies are installed")
+    sys.stdout.write("\n".join(lines) + "\n")
+    
+    return not missing_packages
+
+API_KEY_HELP = "\n".join([
+    "\n⚠️  Please configure required API keys and rerun",
+    "1. Edit .env file",
+    "2. Replace your_newsapi_key_here with real NewsAPI key",
+    "3. Replace your_openai_api_key_here with real OpenAI API key",
+    "4. Save file and rerun this script",
+])
+
+# Records the .env signature of the last successful API key check
+API_KEY_CHECK_CACHE = Path(".env.cache.json")
+
+def _env_signature():
+    """Return the mtime/size signature of .env, or None if it is missing"""
+    try:
+        st = Path(".env").stat()
+    except OSError:
+        return None
+    return {"mtime": st.st_mtime_ns, "size": st.st_size}
+
+def _api_keys_unchanged():
+    """Return whether .env is unchanged since the last successful check"""
+    if _ENV.get("FORCE_RECHECK"):
+        return False
+    signature = _env_signature()
+    if signature is None:
+        return False
+    try:
+        return json.loads(API_KEY_CHECK_CACHE.read_text(encoding="utf-8")) == signature
+    except (OSError, ValueError):
+        return False
+
+def _record_api_key_check(ok):
+    """Remember a successful check, forget the signature otherwise"""
+    signature = _env_signature() if ok else None
+    try:
+        if signature is None:
+            API_KEY_CHECK_CACHE.unlink(missing_ok=True)
+        else:
+            API_KEY_CHECK_CACHE.write_text(json.dumps(signature), encoding="utf-8")
+    except OSError:
+        pass
 
 def check_api_keys():
     """Check API key configuration"""
     print("\n🔑 Checking API key configuration...")
     
-    newsapi_key = os.getenv("NEWSAPI_KEY", "")
-    openai_key = os.getenv("OPENAI_API_KEY", "")
-    
-    if not newsapi_key or newsapi_key == "your_newsapi_key_here":
-        print("  ❌ NewsAPI key not configured")
-        print("     Please register at https://newsapi.org/ to get an API key")
-        return False
-    else:
-        print("  ✅ NewsAPI key configured")
-    
-    if not openai_key or openai_key == "your_openai_api_key_here":
-        print("  ❌ OpenAI API key not configured")
-        print("     Please get an API key from https://platform.openai.com/")
-        return False
-    else:
-        print("  ✅ OpenAI API key configured")
+    if _api_keys_unchanged():
+        print("  ✅ .env unchanged since last successful check (set FORCE_RECHECK=1 to re-run)")
+        return True
     
-    return True
+    ok = _check_api_keys()
+    _record_api_key_check(ok)
+    return ok
+
+# env var -> (label, template placeholder, where to get a key)
+_PLACEHOLDERS = {
+    "NEWSAPI_KEY": ("NewsAPI", "your_newsapi_key_here",
+                    "Please register at https://newsapi.org/ to get an API key"),
+    "OPENAI_API_KEY": ("OpenAI API", "your_openai_api_key_here",
+                       "Please get an API key from https://platform.openai.com/"),
+}
+
+def _check_api_keys():
+    """Validate the configured API keys"""
+    lines = []
+    missing = []
+    
+    for var, (label, placeholder, hint) in _PLACEHOLDERS.items():
+        value = _ENV.get(var, "")
+        if value and value != placeholder:
+            lines.append(f"  ✅ {label} key configured")
+        else:
+            missing.append(var)
+            lines += [f"  ❌ {label} key not configured", f"     {hint}"]
+    sys.stdout.write("\n".join(lines) + "\n")
+    
+    return not missing
 
 def main():
     """Main function"""
@@ -126,10 +220,10 @@ def main():
     
     # 3. Load environment variables
     try:
-        from dotenv import load_dotenv
-        load_dotenv()
+        load_env()
         print("\n✅ Environment variables loaded successfully")
     except ImportError:
+        _record_api_key_check(False)
         print("\n❌ Failed to load environment variables, please install python-dotenv")
         return
     
@@ -138,11 +232,7 @@ def main():
     keys_ok = check_api_keys()
     
     if not keys_ok:
-        print("\n⚠️  Please configure required API keys and rerun")
-        print("1. Edit .env file")
-        print("2. Replace your_newsapi_key_here with real NewsAPI key")
-        print("3. Replace your_openai_api_key_here with real OpenAI API key")
-        print("4. Save file and rerun this script")
+        print(API_KEY_HELP)
         return
     
     # 5. Start application
@@ -5,103 +5,163 @@ Newsletter Agent - Fix Verification Tests
 Verify if system fixes are successful
 """
 
+import functools
+import importlib
+import importlib.util
+import io
 import os
 import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
+# (模块, 需要的属性, 名称)
+IMPORT_CHECKS = [
+    ("newsletter_agent.config.settings", ("settings",), "Config"),
+    ("newsletter_agent.src.agents", ("get_global_agent", "get_agent_status"), "Agent"),
+    ("newsletter_agent.src.tools.ai_generation_tools", ("get_ai_tools",), "AI tools"),
+    ("newsletter_agent.src.tools.data_source_tools", ("get_all_tools",), "Data source tools"),
+    ("newsletter_agent.src.ui.app", ("create_app",), "UI"),
+]
+
+SUCCESS_BANNER = "\n".join([
+    "🎉 All tests passed! System fixes successful!",
+    "\nNext steps:",
+    "1. Configure API keys in .env file",
+    "2. Run python main.py to start the application",
+    "3. Access http://localhost:7860 to use the system",
+])
+
+_PASS = "✅ passed"
+_FAIL = "❌ failed"
+
+def _check(label):
+    """Decorator for checks: an exception is reported as "<label> failed" and the check's run time is printed"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper():
+            start = time.perf_counter()
+            try:
+                return func()
+            except Exception as e:
+                print(f"  ❌ {label} failed: {e}")
+                return False
+            finally:
+                print(f"  ⏱️  {time.perf_counter() - start:.3f}s")
+        return wrapper
+    return decorator
+
+@functools.lru_cache(maxsize=None)
+def _imp(name):
+    """Import a module once and share it between tests"""
+    return importlib.import_module(name)
+
+@_check("Module import")
 def test_imports():
     """Test module imports"""
     print("🔍 Testing module imports...")
     
-    try:
-        # 测试基础模块导入
-        from newsletter_agent.config.settings import settings
-        print("  ✅ Config module imported successfully")
-        
-        from newsletter_agent.src.agents import get_global_agent, get_agent_status
-        print("  ✅ Agent module imported successfully")
-        
-        from newsletter_agent.src.tools.ai_generation_tools import get_ai_tools
-        print("  ✅ AI tools module imported successfully")
-        
-        from newsletter_agent.src.tools.data_source_tools import get_all_tools
-        print("  ✅ Data source tools module imported successfully")
-        
-        from newsletter_agent.src.ui.app import create_app
-        print("  ✅ UI module imported successfully")
-        
-        return True
-        
-    except Exception as e:
-        print(f"  ❌ Module import failed: {e}")
+    # 先用 find_spec 快速确认所有模块都存在，缺失时不再做完整导入
+    missing = [module_name for module_name, _, _ in IMPORT_CHECKS
+               if importlib.util.find_spec(module_name) is None]
+    if missing:
+        print(f"  ❌ Modules not found: {', '.join(missing)}")
         return False
+    
+    # 测试基础模块导入
+    for module_name, attrs, label in IMPORT_CHECKS:
+        module = _imp(module_name)
+        for attr in attrs:
+            getattr(module, attr)
+        print(f"  ✅ {label} module imported successfully")
+    
+    return True
 
+@_check("Tools initialization")
 def test_tools():
     """Test tools initialization"""
     print("\n🔧 Testing tools initialization...")
     
-    try:
-        from newsletter_agent.src.tools.ai_generation_tools import get_ai_tools
-        from newsletter_agent.src.tools.data_source_tools import get_all_tools
-        
-        ai_tools = get_ai_tools()
-        data_tools = get_all_tools()
-        
-        print(f"  ✅ AI tools: {len(ai_tools)} available")
-        print(f"  ✅ Data source tools: {len(data_tools)} available")
-        
-        # 测试工具名称
-        for tool in ai_tools:
-            print(f"    - {tool.name}")
-        
-        for tool in data_tools:
-            print(f"    - {tool.name}")
-        
-        return True
-        
-    except Exception as e:
-        print(f"  ❌ Tools initialization failed: {e}")
-        return False
+    ai_tools = _imp("newsletter_agent.src.tools.ai_generation_tools").get_ai_tools()
+    data_tools = _imp("newsletter_agent.src.tools.data_source_tools").get_all_tools()
+    
+    # 测试工具名称（整段拼好后一次输出）
+    print("\n".join([
+        f"  ✅ AI tools: {len(ai_tools)} available",
+        f"  ✅ Data source tools: {len(data_tools)} available",
+        *(f"    - {tool.name}" for tool in (*ai_tools, *data_tools)),
+    ]))
+    
+    return True
 
+@_check("Agent creation")
 def test_agent():
     """Test agent creation"""
     print("\n🤖 Testing agent creation...")
     
-    try:
-        from newsletter_agent.src.agents import create_newsletter_agent
-        
-        # 不需要真实API密钥也能创建代理
-        agent = create_newsletter_agent()
-        status = agent.get_agent_status()
-        
-        print(f"  ✅ Agent created successfully")
-        print(f"  📊 Agent status: {'Ready' if status.get('is_ready') else 'Not ready'}")
-        print(f"  🔧 Tools count: {status.get('tools_count', 0)}")
-        print(f"  🧠 LLM available: {'Yes' if status.get('llm_available') else 'No'}")
-        
-        return True
-        
-    except Exception as e:
-        print(f"  ❌ Agent creation failed: {e}")
-        return False
+    # 不需要真实API密钥也能创建代理（复用全局代理实例，只创建一次）
+    agent = _imp("newsletter_agent.src.agents").get_global_agent()
+    status = agent.get_agent_status()
+    
+    print(f"  ✅ Agent created successfully")
+    print(f"  📊 Agent status: {'Ready' if status.get('is_ready') else 'Not ready'}")
+    print(f"  🔧 Tools count: {status.get('tools_count', 0)}")
+    print(f"  🧠 LLM available: {'Yes' if status.get('llm_available') else 'No'}")
+    
+    return True
 
+@_check("UI creation")
 def test_ui():
     """Test UI creation"""
     print("\n🎨 Testing UI creation...")
     
+    app = _imp("newsletter_agent.src.ui.app").create_app()
+    
+    print("  ✅ UI created successfully")
+    print("  📱 Gradio app is ready")
+    
+    return True
+
+class _ThreadOutput(io.TextIOBase):
+    """stdout proxy: threads that called capture() write to their own buffer"""
+    
+    def __init__(self, target):
+        self.target = target
+        self._buffers = {}
+    
+    def capture(self):
+        self._buffers[threading.get_ident()] = io.StringIO()
+    
+    def release(self):
+        return self._buffers.pop(threading.get_ident()).getvalue()
+    
+    def write(self, text):
+        buffer = self._buffers.get(threading.get_ident())
+        if buffer is None:
+            return self.target.write(text)
+        return buffer.write(text)
+    
+    def flush(self):
+        self.target.flush()
+
+def _run_test(test_name, test_func):
+    """Run one test, returning (passed, result line)"""
     try:
-        from newsletter_agent.src.ui.app import create_app
-        
-        app = create_app()
-        
-        print("  ✅ UI created successfully")
-        print("  📱 Gradio app is ready")
-        
-        return True
-        
+        if test_func():
+            return True, f"\n✅ {test_name} test passed"
+        return False, f"\n❌ {test_name} test failed"
     except Exception as e:
-        print(f"  ❌ UI creation failed: {e}")
-        return False
+        return False, f"\n💥 {test_name} test exception: {e}"
+
+def _run_test_captured(output, test_name, test_func):
+    """Run one test in a worker thread, returning (passed, full output)"""
+    output.capture()
+    try:
+        passed, result_line = _run_test(test_name, test_func)
+    finally:
+        text = output.release()
+    return passed, f"{text}{result_line}\n"
 
 def main():
     """Main test function"""
@@ -115,30 +175,50 @@ def main():
         ("UI creation", test_ui)
     ]
     
-    passed = 0
     total = len(tests)
+    test_results = {}
     
-    for test_name, test_func in tests:
-        try:
-            if test_func():
-                passed += 1
-                print(f"\n✅ {test_name} test passed")
-            else:
-                print(f"\n❌ {test_name} test failed")
-        except Exception as e:
-            print(f"\n💥 {test_name} test exception: {e}")
+    # 先运行导入测试，其余测试互不依赖，并行运行后按顺序输出
+    import_ok, result_line = _run_test(*tests[0])
+    test_results[tests[0][0]] = import_ok
+    print(result_line)
+    
+    # 其余测试都依赖导入，导入失败时直接结束
+    if not import_ok:
+        sys.stdout.write("\n".join([
+            "\n" + "=" * 50,
+            f"📊 Test results: 0/{total} passed",
+            "⛔ Aborting remaining tests due to import failure",
+        ]) + "\n")
+        return False
     
-    print("\n" + "=" * 50)
-    print(f"📊 Test results: {passed}/{total} passed")
+    output = _ThreadOutput(sys.stdout)
+    sys.stdout = output
+    try:
+        with ThreadPoolExecutor(max_workers=len(tests) - 1) as executor:
+            futures = [executor.submit(_run_test_captured, output, test_name, test_func)
+                       for test_name, test_func in tests[1:]]
+            results = [future.result() for future in futures]
+    finally:
+        sys.stdout = output.target
+    
+    for (test_name, _), (test_passed, text) in zip(tests[1:], results):
+        test_results[test_name] = test_passed
+        sys.stdout.write(text)
+    
+    # 一次遍历同时统计通过数并生成状态表
+    passed = 0
+    lines = ["\n" + "=" * 50]
+    for name, ok in test_results.items():
+        passed += ok
+        lines.append(f"{name:22} - {_PASS if ok else _FAIL}")
+    lines.append(f"📊 Test results: {passed}/{total} passed ({passed / total:.0%})")
     
     if passed == total:
-        print("🎉 All tests passed! System fixes successful!")
-        print("\nNext steps:")
-        print("1. Configure API keys in .env file")
-        print("2. Run python main.py to start the application")
-        print("3. Access http://localhost:7860 to use the system")
+        lines.append(SUCCESS_BANNER)
     else:
-        print("⚠️  Some tests failed, please check error messages")
+        lines.append("⚠️  Some tests failed, please check error messages")
+    sys.stdout.write("\n".join(lines) + "\n")
     
     return passed == total
 